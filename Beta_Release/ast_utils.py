@@ -0,0 +1,197 @@
+'''Cosa fa:
+Funzioni di supporto per visitare e trasformare l'AST a tuple prodotto dal Parser,
+condivise dai passi di ottimizzazione e di analisi.
+'''
+
+OPERATOR_SYMBOLS = {
+    "PLUS": "+", "MINUS": "-", "TIMES": "*", "DIVIDE": "/", "MODULE": "%", "BITAND": "&",
+    "AND": "&&", "OR": "||", "EQ": "==", "NEQ": "!=",
+    "LT": "<", "GT": ">", "LE": "<=", "GE": ">=",
+}
+
+LITERALS = ("int", "float", "string", "bool")
+STEP_NODES = ("pre_increment", "pre_decrement", "post_increment", "post_decrement")
+
+
+def children(expr):
+    # Sotto-espressioni dirette di un'espressione
+    match expr:
+        case ("binop", _, left, right) | ("concat", left, right):
+            return [left, right]
+        case ("not", inner) | ("minus", inner) | ("index", _, inner):
+            return [inner]
+        case ("funcall", _, args):
+            return list(args)
+    return []
+
+
+def walk_expr(expr):
+    # Visita in profondità l'espressione e tutte le sue sotto-espressioni
+    yield expr
+    for child in children(expr):
+        yield from walk_expr(child)
+
+
+def statement_exprs(stmt):
+    # Espressioni che compaiono direttamente nello statement (senza entrare nei corpi annidati)
+    match stmt:
+        case ("declare", _, _, expr) | ("assign", _, expr) | ("cout", expr) | ("return", expr):
+            return [expr] if expr is not None else []
+        case ("if", cond, _, _) | ("while", cond, _):
+            return [cond]
+        case ("assign_index", _, index, expr):
+            return [index, expr]
+        case ("cin", vars_):
+            return [target[2] for target in vars_ if isinstance(target, tuple)]
+        case ("funcall", _, args):
+            return list(args)
+    return []
+
+
+def statement_bodies(stmt):
+    # Blocchi di statement annidati (if/else e while; le funzioni annidate sono escluse)
+    match stmt:
+        case ("if", _, body, else_body):
+            return [body, else_body]
+        case ("while", _, body):
+            return [body]
+    return []
+
+
+def walk_block_exprs(stmts):
+    # Tutte le espressioni (e sotto-espressioni) di un blocco, inclusi i blocchi annidati
+    for stmt in stmts:
+        for expr in statement_exprs(stmt):
+            yield from walk_expr(expr)
+        for body in statement_bodies(stmt):
+            yield from walk_block_exprs(body)
+
+
+def expr_vars(expr):
+    # Nomi di variabile (e di array) letti o incrementati dall'espressione
+    return {node[1] for node in walk_expr(expr) if node[0] in ("var", "index") or node[0] in STEP_NODES}
+
+
+def contains_call(expr):
+    return any(node[0] == "funcall" for node in walk_expr(expr))
+
+
+def is_pure(expr):
+    # Nessuna chiamata di funzione e nessun ++/--: valutarla non modifica lo stato
+    return all(node[0] != "funcall" and node[0] not in STEP_NODES for node in walk_expr(expr))
+
+
+def is_safe(expr):
+    # Pura e senza operazioni che potrebbero sollevare errori: divisioni/moduli con divisore non
+    # letterale o nullo, accessi ad array (indice fuori dai limiti)
+    for node in walk_expr(expr):
+        if node[0] in ("funcall", "index") or node[0] in STEP_NODES:
+            return False
+        if node[0] == "binop" and node[1] in ("DIVIDE", "MODULE"):
+            divisor = node[3]
+            if divisor[0] not in ("int", "float") or float(divisor[1]) == 0:
+                return False
+    return True
+
+
+def assigned_names(stmts):
+    # Nomi dichiarati o modificati da un blocco di statement (ricorsivamente)
+    names = set()
+    for stmt in stmts:
+        match stmt:
+            case ("declare", _, name, _) | ("assign", name, _) | ("declare_array", _, name, _) \
+                 | ("assign_index", name, _, _):
+                names.add(name)
+            case ("cin", vars_):
+                names.update(target[1] if isinstance(target, tuple) else target for target in vars_)
+            case ("function_def", _, name, _, _):
+                names.add(name)
+            case (kind, name) if kind in STEP_NODES:
+                names.add(name)
+        for expr in statement_exprs(stmt):
+            names.update(node[1] for node in walk_expr(expr) if node[0] in STEP_NODES)
+        for body in statement_bodies(stmt):
+            names |= assigned_names(body)
+    return names
+
+
+def block_contains_call(stmts):
+    for stmt in stmts:
+        if stmt[0] == "funcall" or any(contains_call(expr) for expr in statement_exprs(stmt)):
+            return True
+        if any(block_contains_call(body) for body in statement_bodies(stmt)):
+            return True
+    return False
+
+
+def map_expr(expr, fn):
+    # Ricostruisce l'espressione dal basso verso l'alto applicando fn a ogni nodo
+    match expr:
+        case ("binop", op, left, right):
+            expr = ("binop", op, map_expr(left, fn), map_expr(right, fn))
+        case ("concat", left, right):
+            expr = ("concat", map_expr(left, fn), map_expr(right, fn))
+        case ("not", inner) | ("minus", inner):
+            expr = (expr[0], map_expr(inner, fn))
+        case ("index", name, index):
+            expr = ("index", name, map_expr(index, fn))
+        case ("funcall", name, args):
+            expr = ("funcall", name, [map_expr(arg, fn) for arg in args])
+    return fn(expr)
+
+
+def map_statement(stmt, fn):
+    # Applica fn alle espressioni dello statement e, ricorsivamente, dei blocchi if/while annidati
+    match stmt:
+        case ("declare", tipo, name, expr):
+            return ("declare", tipo, name, fn(expr) if expr is not None else None)
+        case ("assign", name, expr):
+            return ("assign", name, fn(expr))
+        case ("assign_index", name, index, expr):
+            return ("assign_index", name, fn(index), fn(expr))
+        case ("cin", vars_):
+            return ("cin", [("index", t[1], fn(t[2])) if isinstance(t, tuple) else t for t in vars_])
+        case ("cout", expr):
+            return ("cout", fn(expr))
+        case ("return", expr):
+            return ("return", fn(expr) if expr is not None else None)
+        case ("funcall", name, args):
+            return ("funcall", name, [fn(arg) for arg in args])
+        case ("if", cond, body, else_body):
+            return ("if", fn(cond), [map_statement(s, fn) for s in body],
+                    [map_statement(s, fn) for s in else_body])
+        case ("while", cond, body):
+            return ("while", fn(cond), [map_statement(s, fn) for s in body])
+    return stmt
+
+
+def format_expr(expr):
+    # Rappresentazione testuale (in sintassi C++) di un'espressione, usata nei report
+    match expr:
+        case ("string", val):
+            return f'"{val}"'
+        case (kind, val) if kind in LITERALS:
+            return str(val)
+        case ("var", name):
+            return name
+        case ("index", name, index):
+            return f"{name}[{format_expr(index)}]"
+        case ("binop", op, left, right):
+            return f"({format_expr(left)} {OPERATOR_SYMBOLS.get(op, op)} {format_expr(right)})"
+        case ("concat", left, right):
+            return f"{format_expr(left)} << {format_expr(right)}"
+        case ("not", inner):
+            return f"!{format_expr(inner)}"
+        case ("minus", inner):
+            return f"-{format_expr(inner)}"
+        case ("funcall", name, args):
+            return f"{name}({', '.join(format_expr(arg) for arg in args)})"
+        case ("pre_increment", name):
+            return f"++{name}"
+        case ("pre_decrement", name):
+            return f"--{name}"
+        case ("post_increment", name):
+            return f"{name}++"
+        case ("post_decrement", name):
+            return f"{name}--"
+    return str(expr)
@@ -0,0 +1,240 @@
+import asyncio
+
+from interpreter import Interpreter
+from rope import plain
+
+
+'''Cosa fa:
+Versione asincrona dell'interprete: cin attende una sorgente di input asincrona e cout scrive su un sink
+asincrono, così un solo event loop può guidare molte sessioni interattive senza un thread per sessione.
+Le espressioni e gli statement che non contengono chiamate di funzione né I/O vengono delegati
+all'interprete sincrono; i cicli cedono il controllo all'event loop ogni `yield_every` statement.
+'''
+
+
+def contains_blocking(node):
+    # True se il nodo contiene una chiamata di funzione o un'istruzione di I/O (che possono sospendersi)
+    if isinstance(node, tuple):
+        if node and node[0] in ("funcall", "cin", "cout"):
+            return True
+        return any(contains_blocking(child) for child in node)
+    if isinstance(node, list):
+        return any(contains_blocking(child) for child in node)
+    return False
+
+
+class AsyncInterpreter(Interpreter):
+    def __init__(self, ast, read_line, write, yield_every=1000):
+        super().__init__(ast)
+        self.read_line = read_line      # coroutine: () -> riga letta (None o "" a fine input)
+        self.write = write              # coroutine: (testo) -> None
+        self.raw_io = read_line, write  # originali, se read_line/write vengono strumentate per io_wait
+        self.yield_every = yield_every  # ogni quanti statement cedere il controllo all'event loop
+        self.steps = 0
+        self.blocking_cache = {}        # id(nodo) -> (nodo, contiene chiamate/I/O)
+
+    async def run(self):
+        # Registra funzioni e variabili globali, poi esegue main e ne restituisce il valore
+        for stmt in self.ast:
+            await self.aexecute(stmt)
+        return plain(await self.aeval_expr(("funcall", "main", [])))
+
+    def is_blocking(self, node):
+        # Il nodo è conservato nella cache insieme al risultato, così il suo id non può essere riusato
+        cached = self.blocking_cache.get(id(node))
+        if cached is None:
+            cached = self.blocking_cache[id(node)] = (node, contains_blocking(node))
+        return cached[1]
+
+    async def aexecute(self, node, current_function_returntype=None):
+        self.steps += 1
+        if self.steps % self.yield_every == 0:
+            await asyncio.sleep(0)  # Punto di cessione cooperativa per le altre sessioni
+
+        match node:
+            case ("if", cond, body, else_body):
+                self.env_stack.append({})
+                try:
+                    branch = body if await self.acond(cond) else else_body
+                    for stmt in branch:
+                        result = await self.aexecute(stmt, current_function_returntype)
+                        if isinstance(result, tuple) and result[0] == "return":
+                            return result
+                finally:
+                    self.env_stack.pop()
+
+            case ("while", cond, body):
+                while await self.acond(cond):
+                    self.env_stack.append({})
+                    try:
+                        for stmt in body:
+                            result = await self.aexecute(stmt, current_function_returntype)
+                            if isinstance(result, tuple) and result[0] == "return":
+                                return result
+                    finally:
+                        self.env_stack.pop()
+
+            case ("cout", expr):
+                output = await self.aeval_expr(expr)
+                if output is not None:
+                    await self.write(str(output))
+
+            case ("cin", vars_):
+                line = await self.read_line()
+                if not line:
+                    raise EOFError("EOF when reading a line")
+                # Gli indici di cin >> a[i] possono chiamare funzioni con I/O: si valutano qui
+                indices = [await self.aeval_expr(target[2]) if isinstance(target, tuple) else None
+                           for target in vars_]
+                self.store_inputs(vars_, line.strip().split(), indices)
+
+            case _ if not self.is_blocking(node):
+                return self.execute(node, current_function_returntype)
+
+            case ("declare", tipo, name, expr):
+                value = await self.aeval_expr(expr) if expr else None
+                self.declare(name, tipo, value)
+
+            case ("assign", name, expr):
+                value = await self.aeval_expr(expr)
+                self.assign(name, (self.lookup(name)[0], value))
+
+            case ("assign_index", name, index, expr):
+                value = await self.aeval_expr(expr)
+                self.store_element(name, await self.aeval_expr(index), value)
+
+            case ("funcall", name, args):
+                await self.aeval_expr(node)
+
+            case ("return", expr):
+                val = await self.aeval_expr(expr) if expr is not None else None
+                return ("return", val)
+
+            case _:
+                return self.execute(node, current_function_returntype)
+
+    async def acond(self, cond):
+        if not self.is_blocking(cond):
+            return self.eval_cond(cond)
+        return await self.aeval_expr(cond)
+
+    async def aeval_expr(self, expr):
+        if not self.is_blocking(expr):
+            return self.eval_expr(expr)
+
+        match expr:
+            case ("funcall", name, args):
+                return await self.acall_function(name, [await self.aeval_expr(arg) for arg in args])
+
+            case ("index", name, index):
+                i = await self.aeval_expr(index)
+                buffer = self.lookup(name)[1]
+                return buffer[self.check_index(name, buffer, i)]
+
+            case ("binop", ("AND" | "OR") as op, left, right):
+                l = self.truth(op, await self.aeval_expr(left))
+                if l == (op == "OR"):
+                    return int(l)
+                return int(self.truth(op, await self.aeval_expr(right)))
+
+            case ("binop", op, left, right):
+                l = await self.aeval_expr(left)
+                r = await self.aeval_expr(right)
+                return self.binop(op, l, r)
+
+            case ("concat", left, right):
+                return str(await self.aeval_expr(left)) + str(await self.aeval_expr(right))
+
+            case ("not", inner):
+                return not await self.aeval_expr(inner)
+
+            case ("minus", inner):
+                return -await self.aeval_expr(inner)
+
+            case _:
+                raise RuntimeError(f"Invalid expression: {expr}")
+
+    async def acall_function(self, name, arg_values):
+        return_type, params, body = self.resolve_function(name, len(arg_values))
+        self.env_stack.append(self.bind_arguments(params, arg_values))
+
+        try:
+            for stmt in body:
+                result = await self.aexecute(stmt, return_type)
+                if isinstance(result, tuple) and result[0] == "return":
+                    return result[1]
+        finally:
+            self.env_stack.pop()
+
+        return self.missing_return(name, return_type)
+
+    #  Eventi: oltre ai metodi sincroni si strumentano le loro controparti asincrone
+
+    def install_hooks(self):
+        super().install_hooks()
+        self.hook("aexecute", self.traced_aexecute, "statement")
+        self.hook("acall_function", self.traced_acall_function, "function_enter", "function_exit")
+        read_line, write = self.raw_io
+        traced = "io_wait" in self.listeners
+        self.read_line = self.traced_read_line if traced else read_line
+        self.write = self.traced_write if traced else write
+
+    async def traced_aexecute(self, node, current_function_returntype=None):
+        # Gli statement che aexecute delega a execute (senza chiamate né I/O, e le definizioni di funzione)
+        # vengono già notificati da execute
+        if node[0] in ("if", "while", "cout", "cin") or node[0] != "function_def" and self.is_blocking(node):
+            self.emit("statement", node)
+        return await type(self).aexecute(self, node, current_function_returntype)
+
+    async def traced_acall_function(self, name, arg_values):
+        self.emit("function_enter", name, arg_values)
+        result = None
+        try:
+            result = await type(self).acall_function(self, name, arg_values)
+            return result
+        finally:
+            self.emit("function_exit", name, result)
+
+    async def traced_read_line(self):
+        self.emit("io_wait", "cin", "begin")
+        try:
+            return await self.raw_io[0]()
+        finally:
+            self.emit("io_wait", "cin", "end")
+
+    async def traced_write(self, text):
+        self.emit("io_wait", "cout", "begin")
+        try:
+            await self.raw_io[1](text)
+        finally:
+            self.emit("io_wait", "cout", "end")
+
+
+if __name__ == "__main__":
+    from lexer import lexer
+    from parser import Parser
+    from semantic_analyzer import SemanticAnalyzer
+
+    codice = '''
+    int quadrato(int x) {
+        return x * x;
+    }
+
+    int main() {
+        int n;
+        cin >> n;
+        cout << "quadrato: " << quadrato(n) << endl;
+        return 0;
+    }
+    '''
+
+    ast = Parser(lexer(codice)).parse()
+    SemanticAnalyzer(ast).analyze()
+
+    async def leggi():
+        return "7\n"
+
+    async def scrivi(testo):
+        print(testo, end="")
+
+    asyncio.run(AsyncInterpreter(ast, leggi, scrivi).run())
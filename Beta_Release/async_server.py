@@ -0,0 +1,124 @@
+import asyncio
+import json
+import sys
+import time
+
+from async_interpreter import AsyncInterpreter
+from lexer import lexer
+from parser import Parser
+from semantic_analyzer import SemanticAnalyzer
+
+
+'''Cosa fa:
+Server TCP locale di prova per le sessioni interattive: ogni connessione è un programma eseguito
+dall'AsyncInterpreter sullo stesso event loop.
+Protocollo (una riga JSON per messaggio):
+  client -> server: {"source": codice} come primo messaggio, poi {"in": riga} per ogni riga di input
+  server -> client: {"out": testo} per ogni cout, infine {"exit": valore} oppure {"error": messaggio}
+'''
+
+
+async def handle_session(reader, writer, yield_every=1000):
+    async def read_line():
+        line = await reader.readline()
+        if not line:
+            return None
+        return json.loads(line)["in"]
+
+    async def write(text):
+        writer.write((json.dumps({"out": text}) + "\n").encode())
+        await writer.drain()
+
+    try:
+        request = json.loads(await reader.readline())
+        ast = Parser(lexer(request["source"])).parse()
+        SemanticAnalyzer(ast).analyze()
+        value = await AsyncInterpreter(ast, read_line, write, yield_every).run()
+        reply = {"exit": value}
+    except Exception as e:
+        reply = {"error": f"{type(e).__name__}: {e}"}
+
+    try:
+        writer.write((json.dumps(reply) + "\n").encode())
+        await writer.drain()
+        writer.close()
+        await writer.wait_closed()
+    except ConnectionError:
+        pass
+
+
+async def serve(host="127.0.0.1", port=0, yield_every=1000):
+    return await asyncio.start_server(
+        lambda r, w: handle_session(r, w, yield_every), host, port, limit=2 ** 20, backlog=4096)
+
+
+'''Cosa fa:
+Test di carico: apre `sessions` connessioni contemporanee. Ogni programma resta bloccato su cin
+finché il client non invia l'input (dopo `think_time` secondi), poi esegue un ciclo di `n` iterazioni.
+'''
+
+LOAD_ITERATIONS = 200
+
+LOAD_PROGRAM = '''
+int main() {
+    int n;
+    cin >> n;
+    int i = 0;
+    int s = 0;
+    while (i < n) {
+        s = s + i;
+        i = i + 1;
+    }
+    cout << s << endl;
+    return 0;
+}
+'''
+
+
+async def client_session(port, n, think_time):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port, limit=2 ** 20)
+    writer.write((json.dumps({"source": LOAD_PROGRAM}) + "\n").encode())
+    await asyncio.sleep(think_time)                 # il programma è fermo su cin
+    writer.write((json.dumps({"in": str(n)}) + "\n").encode())
+    await writer.drain()
+
+    output = ""
+    while True:
+        message = json.loads(await reader.readline())
+        if "out" in message:
+            output += message["out"]
+        else:
+            break
+    writer.close()
+    await writer.wait_closed()
+    if "error" in message or output != f"{n * (n - 1) // 2}\n":
+        raise RuntimeError(f"Unexpected session result: {message}, output {output!r}")
+
+
+async def load_test(sessions, n=LOAD_ITERATIONS, think_time=0.5):
+    server = await serve()
+    port = server.sockets[0].getsockname()[1]
+    start = time.perf_counter()
+    async with server:
+        await asyncio.gather(*(client_session(port, n, think_time) for _ in range(sessions)))
+    return time.perf_counter() - start
+
+
+def raise_fd_limit():
+    # Ogni sessione usa due socket nello stesso processo (client e server)
+    try:
+        import resource
+    except ImportError:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft != hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+if __name__ == "__main__":
+    raise_fd_limit()
+    counts = [int(arg) for arg in sys.argv[1:]] or [10, 100, 1000, 2000]
+    for sessions in counts:
+        elapsed = asyncio.run(load_test(sessions))
+        print(f"{sessions:6d} concurrent sessions: {elapsed:.2f}s "
+              f"({sessions * LOAD_ITERATIONS / elapsed:,.0f} loop iterations/s)")
@@ -0,0 +1,349 @@
+import io
+
+from runner import run_program
+
+try:
+    import numpy as np
+except ImportError:     # senza NumPy si usa sempre l'esecuzione scalare
+    np = None
+
+
+'''Cosa fa:
+Esegue lo stesso programma (già analizzato) su molti input contemporaneamente. Ogni "lane" è
+un'esecuzione indipendente con il proprio stdin; le variabili TYPE_INT/TYPE_FLOAT/TYPE_BOOL sono
+array NumPy con un elemento per lane.
+Le diramazioni divergenti di if/while sono gestite con maschere: ogni statement agisce solo sulle
+lane attive, e un while continua finché almeno una lane ne soddisfa la condizione.
+I costrutti che non si possono vettorizzare mantenendo esattamente il risultato dell'interprete
+(stringhe, chiamate di funzione diverse da main, divisioni per zero, overflow a 64 bit, input non
+valido, variabili che conterrebbero tipi Python diversi in lane diverse, variabili lette prima di
+ricevere un valore, che nell'interprete valgono None...) sollevano Unvectorizable:
+in quel caso l'intero lotto viene rieseguito lane per lane con l'Interpreter.
+'''
+
+INT_LIMIT = 2 ** 62     # oltre questo valore l'aritmetica int64 potrebbe non coincidere con gli int Python
+
+
+class Unvectorizable(Exception):
+    pass
+
+
+class BatchInterpreter:
+    def __init__(self, ast, inputs):
+        self.ast = ast
+        self.inputs = list(inputs)  # testo dello stdin di ogni lane
+        self.lanes = len(self.inputs)
+        self.vectorized = False     # True se l'ultima esecuzione è avvenuta in forma vettoriale
+        self.fallback_reason = None
+
+    def run(self):
+        # Restituisce l'output (testo stampato da cout) di ogni lane, o l'eccezione se la lane è fallita
+        if np is not None and self.lanes > 0:
+            try:
+                outputs = self.run_vectorized()
+                self.vectorized = True
+                return outputs
+            except Unvectorizable as e:
+                self.fallback_reason = str(e)
+        self.vectorized = False
+        return [self.run_lane(text) for text in self.inputs]
+
+    def run_lane(self, text):
+        # Come run_many: una lane che fallisce restituisce l'eccezione sollevata al posto del suo output,
+        # senza interrompere le altre
+        try:
+            return self.run_scalar(text)
+        except Exception as e:
+            return e
+
+    def run_scalar(self, text):
+        output = io.StringIO()
+        run_program(self.ast, io.StringIO(text), output)
+        return output.getvalue()
+
+    #  Esecuzione vettoriale
+
+    def run_vectorized(self):
+        self.env_stack = [{}]
+        self.functions = {}
+        self.alive = np.ones(self.lanes, dtype=bool)    # lane che non hanno ancora eseguito return
+        self.lines = [text.splitlines() for text in self.inputs]
+        self.cursor = [0] * self.lanes
+        self.outputs = [[] for _ in range(self.lanes)]
+
+        everyone = np.ones(self.lanes, dtype=bool)
+        with np.errstate(all="ignore"):
+            for stmt in self.ast:
+                if stmt[0] == "function_def":
+                    self.functions[stmt[2]] = stmt
+                else:
+                    self.execute(stmt, everyone)
+
+            if "main" not in self.functions:
+                raise Unvectorizable("no main function")
+            _, _, _, params, body = self.functions["main"]
+            if params:
+                raise Unvectorizable("main with parameters")
+            self.env_stack.append({})
+            self.block(body, everyone)
+
+        return ["".join(parts) for parts in self.outputs]
+
+    def block(self, stmts, mask):
+        for stmt in stmts:
+            mask = mask & self.alive
+            if not mask.any():
+                return
+            self.execute(stmt, mask)
+
+    def scoped_block(self, stmts, mask):
+        self.env_stack.append({})
+        try:
+            self.block(stmts, mask)
+        finally:
+            self.env_stack.pop()
+
+    def execute(self, node, mask):
+        match node:
+            case ("declare", tipo, name, expr):
+                if tipo not in ("TYPE_INT", "TYPE_FLOAT", "TYPE_BOOL"):
+                    raise Unvectorizable(f"variable '{name}' of type {tipo}")
+                env = self.env_stack[-1]
+                if name in env:
+                    raise Unvectorizable(f"redeclaration of '{name}'")
+                if expr is None:
+                    value = np.zeros(self.lanes, dtype=DTYPES[tipo])
+                    initialized = np.zeros(self.lanes, dtype=bool)
+                else:
+                    value = np.broadcast_to(np.asarray(self.eval(expr, mask)), (self.lanes,)).copy()
+                    initialized = np.ones(self.lanes, dtype=bool)
+                env[name] = (tipo, value, initialized)
+
+            case ("assign", name, expr):
+                self.store(name, self.eval(expr, mask), mask)
+
+            case ("if", cond, body, else_body):
+                taken = self.truth(self.eval(cond, mask))
+                self.scoped_block(body, mask & taken)
+                self.scoped_block(else_body, mask & ~taken)
+
+            case ("while", cond, body):
+                while True:
+                    mask = mask & self.alive
+                    if not mask.any():
+                        break
+                    mask = mask & self.truth(self.eval(cond, mask))
+                    if not mask.any():
+                        break
+                    self.scoped_block(body, mask)
+
+            case ("cout", expr):
+                self.cout(expr, mask)
+
+            case ("cin", vars_):
+                self.cin(vars_, mask)
+
+            case ("return", expr):
+                if expr is not None:
+                    self.eval(expr, mask)
+                self.alive = self.alive & ~mask
+
+            case (("pre_increment" | "pre_decrement" | "post_increment" | "post_decrement"), _):
+                self.eval(node, mask)
+
+            case _:
+                raise Unvectorizable(f"statement {node[0]}")
+
+    #  Variabili
+
+    def lookup(self, name):
+        for env in reversed(self.env_stack):
+            if name in env:
+                return env, env[name]
+        raise Unvectorizable(f"variable '{name}' not declared")
+
+    def read(self, name, mask):
+        # Valore della variabile; nelle lane attive deve essere già stata assegnata
+        _, (tipo, value, initialized) = self.lookup(name)
+        if not initialized[mask].all():
+            raise Unvectorizable(f"variable '{name}' read before being assigned")
+        return tipo, value
+
+    def store(self, name, value, mask):
+        env, (tipo, old, initialized) = self.lookup(name)
+        value = np.asarray(value)
+        if (mask | ~self.alive).all():
+            new = np.broadcast_to(value, (self.lanes,)).copy()
+        elif value.dtype != old.dtype:
+            # Le lane conterrebbero valori Python di tipo diverso (es. int e float nella stessa variabile)
+            raise Unvectorizable(f"mixed value types in '{name}'")
+        else:
+            new = np.where(mask, value, old)
+        env[name] = (tipo, new, initialized | mask)
+
+    #  I/O
+
+    def cout(self, expr, mask):
+        pieces = []
+        while expr[0] == "concat":      # concat è associativo a sinistra: si raccolgono i pezzi
+            pieces.append(expr[2])
+            expr = expr[1]
+        pieces.append(expr)
+        pieces.reverse()
+
+        columns = []
+        for piece in pieces:
+            if piece[0] == "string":
+                columns.append(piece[1])
+            else:
+                value = np.broadcast_to(np.asarray(self.eval(piece, mask)), (self.lanes,))
+                columns.append(value.tolist())  # valori Python: stessa stampa dell'interprete
+
+        for lane in np.flatnonzero(mask):
+            self.outputs[lane].append("".join(c if isinstance(c, str) else str(c[lane]) for c in columns))
+
+    def cin(self, vars_, mask):
+        if not all(isinstance(name, str) for name in vars_):
+            raise Unvectorizable("cin into array element")
+        targets = [(name, self.lookup(name)[1][0]) for name in vars_]
+        for _, tipo in targets:
+            if tipo not in ("TYPE_INT", "TYPE_FLOAT"):
+                raise Unvectorizable(f"cin into {tipo}")
+        columns = [np.zeros(self.lanes, dtype=DTYPES[tipo]) for _, tipo in targets]
+
+        for lane in np.flatnonzero(mask):
+            if self.cursor[lane] >= len(self.lines[lane]):
+                raise Unvectorizable("input exhausted")
+            words = self.lines[lane][self.cursor[lane]].strip().split()
+            self.cursor[lane] += 1
+            if len(words) < len(vars_):
+                raise Unvectorizable("not enough input values")
+            for column, (_, tipo), text in zip(columns, targets, words):
+                try:
+                    column[lane] = int(text) if tipo == "TYPE_INT" else float(text)
+                except (ValueError, OverflowError):
+                    raise Unvectorizable(f"invalid input {text!r}")
+
+        for (name, _), column in zip(targets, columns):
+            self.store(name, column, mask)
+
+    #  Espressioni
+
+    def truth(self, value):
+        return np.broadcast_to(np.asarray(value) != 0, (self.lanes,))
+
+    def eval(self, expr, mask):
+        match expr:
+            case ("int", val):
+                val = int(val)
+                if abs(val) >= INT_LIMIT:
+                    raise Unvectorizable("integer literal out of range")
+                return np.int64(val)
+            case ("float", val):
+                return np.float64(val)
+            case ("bool", val):
+                return np.bool_(val.lower() == "true")
+
+            case ("var", name):
+                return self.read(name, mask)[1]
+
+            case ("not", inner):
+                return np.logical_not(self.eval(inner, mask))
+
+            case ("minus", inner):
+                return np.negative(self.eval(inner, mask))
+
+            case (("pre_increment" | "pre_decrement" | "post_increment" | "post_decrement") as op, name):
+                tipo, value = self.read(name, mask)
+                step = (1 if tipo == "TYPE_INT" else 1.0) * (1 if "increment" in op else -1)
+                new = value + step
+                self.check_int_range(new, mask)
+                self.store(name, new, mask)
+                return new if op.startswith("pre") else value
+
+            case ("binop", ("AND" | "OR") as op, left, right):
+                l = self.truth(self.eval(left, mask))
+                if op == "AND":     # il secondo operando si valuta solo dove serve (corto circuito)
+                    return (l & self.truth(self.eval(right, mask & l))).astype(np.int64)
+                return (l | self.truth(self.eval(right, mask & ~l))).astype(np.int64)
+
+            case ("binop", op, left, right):
+                return self.binop(op, self.eval(left, mask), self.eval(right, mask), mask)
+
+        raise Unvectorizable(f"expression {expr[0]}")
+
+    def binop(self, op, l, r, mask):
+        match op:
+            case "PLUS" | "MINUS" | "TIMES":
+                result = np.add(l, r) if op == "PLUS" else np.subtract(l, r) if op == "MINUS" \
+                    else np.multiply(l, r)
+                if np.asarray(result).dtype.kind in "iu":
+                    # Stima in virgola mobile per riconoscere gli overflow di int64
+                    wide = np.asarray(l, dtype=np.float64)
+                    estimate = np.add(wide, r) if op == "PLUS" else \
+                        np.subtract(wide, r) if op == "MINUS" else np.multiply(wide, r)
+                    self.check_int_range(estimate, mask)
+                return result
+            case "DIVIDE" | "MODULE":
+                zero = np.broadcast_to(np.asarray(r) == 0, (self.lanes,))
+                if (zero & mask).any():
+                    raise Unvectorizable("division by zero")
+                safe = np.where(zero, 1, r)
+                return np.true_divide(l, safe) if op == "DIVIDE" else np.mod(l, safe)
+            case "BITAND":  # x % 2^k riscritto dall'ottimizzatore; sui float resta il modulo
+                if np.asarray(l).dtype.kind in "iub":
+                    return np.bitwise_and(l, r)
+                return np.mod(l, np.add(r, 1))
+            case "EQ": return np.equal(l, r)
+            case "NEQ": return np.not_equal(l, r)
+            case "LT": return np.less(l, r)
+            case "GT": return np.greater(l, r)
+            case "LE": return np.less_equal(l, r)
+            case "GE": return np.greater_equal(l, r)
+        raise Unvectorizable(f"operator {op}")
+
+    def check_int_range(self, values, mask):
+        values = np.broadcast_to(np.asarray(values), (self.lanes,))
+        if values.dtype.kind in "iuf" and (np.abs(values[mask]) >= INT_LIMIT).any():
+            raise Unvectorizable("integer overflow")
+
+
+DTYPES = {"TYPE_INT": np.int64, "TYPE_FLOAT": np.float64, "TYPE_BOOL": np.bool_} if np is not None else {}
+
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    from lexer import lexer
+    from parser import Parser
+    from semantic_analyzer import SemanticAnalyzer
+
+    codice = '''
+    int main() {
+        int n;
+        cin >> n;
+        int i = 1;
+        int somma = 0;
+        while (i <= n) {
+            if (i % 3 == 0 || i % 5 == 0) {
+                somma = somma + i;
+            }
+            i = i + 1;
+        }
+        cout << "multipli di 3 o 5 fino a " << n << ": " << somma << endl;
+        return 0;
+    }
+    '''
+
+    ast = Parser(lexer(codice)).parse()
+    SemanticAnalyzer(ast).analyze()
+    inputs = [f"{random.randint(1, 1000)}\n" for _ in range(2000)]
+
+    batch = BatchInterpreter(ast, inputs)
+    start = time.perf_counter()
+    outputs = batch.run()
+    print(f"batch: {time.perf_counter() - start:.2f}s (vectorized: {batch.vectorized}, {batch.fallback_reason})")
+    start = time.perf_counter()
+    expected = [batch.run_scalar(text) for text in inputs]
+    print(f"scalar: {time.perf_counter() - start:.2f}s, same outputs: {outputs == expected}")
@@ -0,0 +1,71 @@
+import io
+import time
+import tracemalloc
+
+from interpreter import Interpreter
+from lexer import lexer
+from parser import Parser
+from semantic_analyzer import SemanticAnalyzer
+
+
+'''Cosa fa:
+Confronto di memoria tra un array `int dati[N]` (buffer array('q')) e il programma equivalente
+scritto con N variabili scalari globali (`int dati0 = ...;`), come si faceva prima degli array.
+Per entrambi si misura la memoria allocata dall'esecuzione (tracemalloc) e il tempo.
+'''
+
+BASE = 1_000_000_000    # valori grandi: gli int Python piccoli sarebbero condivisi e non allocati
+
+
+def array_program(n):
+    return f'''
+int dati[{n}];
+int main() {{
+    int i = 0;
+    while (i < {n}) {{
+        dati[i] = {BASE} + i;
+        i = i + 1;
+    }}
+    cout << dati[{n} - 1] << endl;
+    return 0;
+}}
+'''
+
+
+def scalar_program(n):
+    declarations = "\n".join(f"int dati{i} = {BASE} + {i};" for i in range(n))
+    return f'''
+{declarations}
+int main() {{
+    cout << dati{n - 1} << endl;
+    return 0;
+}}
+'''
+
+
+def measure(source):
+    ast = Parser(lexer(source)).parse()
+    SemanticAnalyzer(ast).analyze()
+    output = io.StringIO()
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        interpreter = Interpreter(ast, io.StringIO(), output)
+        for stmt in ast:
+            interpreter.execute(stmt)
+        interpreter.eval_expr(("funcall", "main", []))
+        elapsed = time.perf_counter() - start
+        retained = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return output.getvalue(), elapsed, retained
+
+
+if __name__ == "__main__":
+    for n in (1_000, 10_000, 50_000):
+        array_out, array_time, array_mem = measure(array_program(n))
+        scalar_out, scalar_time, scalar_mem = measure(scalar_program(n))
+        assert array_out == scalar_out
+        print(f"n={n:6d}  array {array_mem / 2 ** 10:8.1f} KiB {array_time:5.2f}s   "
+              f"scalars {scalar_mem / 2 ** 10:8.1f} KiB {scalar_time:5.2f}s   "
+              f"({scalar_mem / array_mem:4.1f}x)")
@@ -0,0 +1,91 @@
+import io
+import time
+
+from interpreter import Interpreter
+from lexer import lexer
+from parser import Parser
+from semantic_analyzer import SemanticAnalyzer
+
+
+'''Cosa fa:
+Benchmark su cicli ricchi di guardie: confronta l'interprete attuale (corto circuito per && / || e
+condizioni di if/while compilate in test diretti) con una variante che riproduce il comportamento
+precedente (entrambi gli operandi sempre valutati, condizioni valutate con eval_expr).
+'''
+
+GUARDED_CALL = '''
+int costosa(int n) {
+    int i = 0;
+    int s = 0;
+    while (i < 20) {
+        s = s + n;
+        i = i + 1;
+    }
+    return s;
+}
+
+int main() {
+    int i = 0;
+    int trovati = 0;
+    while (i < 20000) {
+        if (i % 100 == 0 && costosa(i) > 0) {
+            trovati = trovati + 1;
+        }
+        i = i + 1;
+    }
+    cout << trovati << endl;
+    return 0;
+}
+'''
+
+GUARD_CHAIN = '''
+int main() {
+    int i = 0;
+    int a = 3;
+    int b = 7;
+    int conta = 0;
+    while (i < 50000) {
+        if (i > a || i < b || i == b) {
+            conta = conta + 1;
+        }
+        if (!(i >= 10) && a != b) {
+            conta = conta + 1;
+        }
+        i = i + 1;
+    }
+    cout << conta << endl;
+    return 0;
+}
+'''
+
+
+class EagerInterpreter(Interpreter):
+    # Comportamento precedente: nessun corto circuito e nessuna compilazione delle condizioni
+    def eval_cond(self, cond):
+        return self.eval_expr(cond)
+
+    def eval_expr(self, expr):
+        if expr[0] == "binop" and expr[1] in ("AND", "OR"):
+            l = self.truth(expr[1], self.eval_expr(expr[2]))
+            r = self.truth(expr[1], self.eval_expr(expr[3]))
+            return int(l and r) if expr[1] == "AND" else int(l or r)
+        return super().eval_expr(expr)
+
+
+def run(interpreter_class, ast):
+    interpreter = interpreter_class(ast, stdout=io.StringIO())
+    start = time.perf_counter()
+    for stmt in ast:
+        interpreter.execute(stmt)
+    interpreter.eval_expr(("funcall", "main", []))
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    for name, code in (("guarded call", GUARDED_CALL), ("guard chain", GUARD_CHAIN)):
+        ast = Parser(lexer(code)).parse()
+        SemanticAnalyzer(ast).analyze()
+        eager = run(EagerInterpreter, ast)
+        short = run(Interpreter, ast)
+        print(f"{name:14s} eager {eager:.3f}s   short-circuit/compiled {short:.3f}s   "
+              f"speedup x{eager / short:.2f}")
@@ -0,0 +1,94 @@
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from daemon_client import DaemonClient
+
+
+'''Cosa fa:
+Benchmark di latenza per richiesta: lo stesso programma piccolo eseguito
+  - a freddo, con un nuovo processo `python runner.py` per ogni esecuzione;
+  - con il client leggero (`python daemon_client.py`), un processo per richiesta verso il daemon caldo;
+  - sul daemon caldo da una connessione già aperta (solo il costo della richiesta).
+Riporta la mediana in millisecondi e controlla che gli output coincidano.
+'''
+
+PROGRAM = '''
+int quadrato(int x) {
+    return x * x;
+}
+
+int main() {
+    int n;
+    cin >> n;
+    int i = 1;
+    int somma = 0;
+    while (i <= n) {
+        somma = somma + quadrato(i);
+        i = i + 1;
+    }
+    cout << "somma dei quadrati: " << somma << endl;
+    return 0;
+}
+'''
+
+STDIN = "100\n"
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return result, statistics.median(samples) * 1000
+
+
+def wait_for_socket(path, daemon, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(path):
+        if daemon.poll() is not None or time.monotonic() > deadline:
+            raise RuntimeError("Daemon did not start")
+        time.sleep(0.05)
+
+
+if __name__ == "__main__":
+    directory = tempfile.mkdtemp()
+    program = os.path.join(directory, "programma.cpp")
+    with open(program, "w") as f:
+        f.write(PROGRAM)
+    socket_path = os.path.join(directory, "tnf.sock")
+
+    def cold():
+        return subprocess.run([sys.executable, os.path.join(HERE, "runner.py"), program],
+                              input=STDIN, capture_output=True, text=True, check=True).stdout
+
+    def thin_client():
+        return subprocess.run([sys.executable, os.path.join(HERE, "daemon_client.py"), "--socket", socket_path,
+                               program], input=STDIN, capture_output=True, text=True, check=True).stdout
+
+    daemon = subprocess.Popen([sys.executable, os.path.join(HERE, "daemon.py"), socket_path],
+                              stderr=subprocess.DEVNULL)
+    try:
+        wait_for_socket(socket_path, daemon)
+        with DaemonClient(socket_path) as client:
+            def warm():
+                pieces = []
+                client.run(PROGRAM, STDIN, write=pieces.append)
+                return "".join(pieces)
+
+            expected, cold_ms = timed(cold, 30)
+            client_out, client_ms = timed(thin_client, 30)
+            warm_out, warm_ms = timed(warm, 200)
+        assert expected == client_out == warm_out, "outputs differ"
+    finally:
+        daemon.terminate()
+        daemon.wait()
+
+    print(f"cold start (runner.py):          {cold_ms:7.2f} ms")
+    print(f"thin client + warm daemon:       {client_ms:7.2f} ms")
+    print(f"warm daemon, open connection:    {warm_ms:7.2f} ms")
@@ -0,0 +1,56 @@
+import io
+import time
+
+from lexer import lexer
+from parser import Parser
+from runner import run_program
+from semantic_analyzer import SemanticAnalyzer
+
+
+'''Cosa fa:
+Benchmark del parsing pigro dei corpi di funzione su un programma generato con molte funzioni
+di supporto, di cui main ne usa solo alcune: confronta il tempo di avvio (parser + analisi) e il
+tempo totale di esecuzione in modalità normale e pigra. Il lexing è comune alle due modalità.
+'''
+
+HELPER = '''
+int helper{i}(int x) {{
+    int acc = 0;
+    int k = 0;
+    while (k < 3) {{
+        if (x % 2 == 0 && k != 1) {{
+            acc = acc + x * {i};
+        }} else {{
+            acc = acc - k;
+        }}
+        k = k + 1;
+    }}
+    return acc + {i};
+}}
+'''
+
+
+def generate(helpers, used):
+    calls = " + ".join(f"helper{i}(n)" for i in range(used))
+    main = f"int main() {{\n    int n = 4;\n    cout << {calls} << endl;\n    return 0;\n}}\n"
+    return "".join(HELPER.format(i=i) for i in range(helpers)) + main
+
+
+def measure(tokens, lazy):
+    start = time.perf_counter()
+    ast = Parser(tokens, lazy).parse()
+    SemanticAnalyzer(ast).analyze()
+    startup = time.perf_counter() - start
+    output = io.StringIO()
+    run_program(ast, stdout=output)
+    return startup, time.perf_counter() - start, output.getvalue()
+
+
+if __name__ == "__main__":
+    for helpers in (100, 500, 2000):
+        tokens = lexer(generate(helpers, used=5))
+        eager_start, eager_total, eager_out = measure(tokens, lazy=False)
+        lazy_start, lazy_total, lazy_out = measure(tokens, lazy=True)
+        assert eager_out == lazy_out
+        print(f"{helpers:5d} functions  startup eager {eager_start * 1000:7.1f} ms  lazy {lazy_start * 1000:6.1f} ms"
+              f"   total eager {eager_total * 1000:7.1f} ms  lazy {lazy_total * 1000:6.1f} ms")
@@ -0,0 +1,54 @@
+import os
+import time
+
+from lexer import lexer, lexer_parallel
+
+
+'''Cosa fa:
+Benchmark del lexing parallelo su sorgenti generati di dimensione crescente: confronta lexer()
+con lexer_parallel() al variare del numero di processi, per vedere da quale dimensione conviene
+e come scala. Il tempo del parallelo include l'avvio del pool e il trasferimento dei token.
+'''
+
+BLOCK = '''
+int funzione{i}(int x, float y) {{
+    // commento con "virgolette" e simboli {{ }} ;
+    string s = "testo // non e' un commento";
+    while (x > 0 && y <= 3.5) {{
+        x = x - 1;
+        cout << s << x << endl;
+    }}
+    return x * 2 + {i};
+}}
+'''
+
+
+def generate(size):
+    parts = []
+    total = 0
+    i = 0
+    while total < size:
+        block = BLOCK.format(i=i)
+        parts.append(block)
+        total += len(block)
+        i += 1
+    return "".join(parts)
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+if __name__ == "__main__":
+    print(f"CPU: {os.cpu_count()}")
+    for size in (1 << 18, 1 << 20, 4 << 20, 16 << 20):
+        code = generate(size)
+        sequential, expected = timed(lexer, code)
+        line = f"{len(code) / 2 ** 20:5.1f} MiB  lexer {sequential:6.2f}s"
+        for workers in (2, 4, 8):
+            elapsed, tokens = timed(lexer_parallel, code, workers=workers, min_chunk=1 << 16)
+            assert tokens == expected
+            line += f"  {workers}p {elapsed:6.2f}s"
+        print(line)
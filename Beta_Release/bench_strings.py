@@ -0,0 +1,71 @@
+import io
+import time
+import tracemalloc
+
+from interpreter import Interpreter
+from lexer import lexer
+from parser import Parser
+from semantic_analyzer import SemanticAnalyzer
+
+
+'''Cosa fa:
+Benchmark di concatenazione ripetuta `s = s + x;`: confronta le stringhe a Rope con la
+concatenazione piatta di str usata in precedenza, misurando tempo e picco di memoria
+(tracemalloc) al crescere del numero di iterazioni.
+'''
+
+APPEND_PROGRAM = '''
+int main() {
+    int n;
+    cin >> n;
+    string s = "";
+    int i = 0;
+    while (i < n) {
+        s = s + "0123456789abcdef0123456789abcdef";
+        i = i + 1;
+    }
+    cout << s << endl;
+    return 0;
+}
+'''
+
+
+class FlatStringInterpreter(Interpreter):
+    # Comportamento precedente: ogni somma di stringhe produce una nuova str completa
+    def binop(self, op, l, r):
+        if op == "PLUS" and (isinstance(l, str) or isinstance(r, str)):
+            return str(l) + str(r)
+        return super().binop(op, l, r)
+
+
+def run(interpreter_class, ast, n):
+    output = io.StringIO()
+    interpreter = interpreter_class(ast, io.StringIO(f"{n}\n"), output)
+    for stmt in ast:
+        interpreter.execute(stmt)
+    interpreter.eval_expr(("funcall", "main", []))
+    assert len(output.getvalue()) == 32 * n + 1
+
+
+def measure(interpreter_class, ast, n):
+    # Tempo e picco di memoria in due esecuzioni separate: tracemalloc rallenta l'interprete
+    start = time.perf_counter()
+    run(interpreter_class, ast, n)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    try:
+        run(interpreter_class, ast, n)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return elapsed, peak
+
+
+if __name__ == "__main__":
+    ast = Parser(lexer(APPEND_PROGRAM)).parse()
+    SemanticAnalyzer(ast).analyze()
+    for n in (10_000, 25_000, 50_000, 100_000):
+        flat_time, flat_peak = measure(FlatStringInterpreter, ast, n)
+        rope_time, rope_peak = measure(Interpreter, ast, n)
+        print(f"n={n:7d}  flat {flat_time:6.2f}s {flat_peak / 2 ** 20:6.1f} MiB   "
+              f"rope {rope_time:6.2f}s {rope_peak / 2 ** 20:6.1f} MiB")
@@ -0,0 +1,43 @@
+import sys
+import time
+
+from runner import run_many
+
+
+'''Cosa fa:
+Benchmark di scalabilità: esegue lo stesso lotto di programmi indipendenti con run_many al variare
+del numero di thread e riporta i programmi completati al secondo.
+Con il GIL attivo il throughput resta circa costante; con il CPython free-threaded cresce con i core.
+'''
+
+PROGRAM = '''
+int fib(int n) {
+    if (n < 2) {
+        return n;
+    }
+    return fib(n - 1) + fib(n - 2);
+}
+
+int main() {
+    int n;
+    cin >> n;
+    cout << fib(n) << endl;
+    return 0;
+}
+'''
+
+JOBS = [(PROGRAM, f"{15 + i % 3}\n") for i in range(48)]
+
+
+if __name__ == "__main__":
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"Python {sys.version.split()[0]}, GIL {'enabled' if gil else 'disabled'}")
+    expected = None
+    for threads in (1, 2, 4, 8):
+        start = time.perf_counter()
+        outputs = run_many(JOBS, max_workers=threads)
+        elapsed = time.perf_counter() - start
+        if expected is None:
+            expected = outputs
+        assert outputs == expected, "outputs differ between thread counts"
+        print(f"{threads:2d} threads: {len(JOBS) / elapsed:6.1f} programs/s")
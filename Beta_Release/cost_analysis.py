@@ -0,0 +1,377 @@
+from math import ceil, floor
+
+from ast_utils import (STEP_NODES, assigned_names, block_contains_call, expr_vars, format_expr, is_pure,
+                       statement_exprs, walk_expr)
+from optimizer import iter_block
+from semantic_analyzer import SemanticAnalyzer
+
+
+'''Cosa fa:
+Stima del costo di esecuzione, prima di eseguire il programma, sull'AST già analizzato.
+Eredita dal SemanticAnalyzer per conoscere il tipo delle variabili durante la visita:
+  - per ogni while riconosce una variabile di induzione (un int confrontato con un limite che il ciclo
+    non modifica, aggiornato una sola volta per iterazione con `i = i ± c`, `i++`, `i--` o `i = i * c`)
+    e ne ricava il numero di iterazioni, numerico se inizio e limite sono costanti note, altrimenti
+    simbolico (es. `(n - i)`, `log2(n / i)`);
+  - costruisce il grafo delle chiamate e ne ricava le funzioni ricorsive (componenti fortemente connesse);
+  - assegna a ogni funzione una classe di costo: constant, linear, nested-polynomial (grado = numero di
+    cicli con limite simbolico annidati, contando anche le funzioni chiamate) oppure unknown (cicli non
+    riconosciuti o potenzialmente infiniti, ricorsione, chiamate a funzioni ricorsive);
+  - un costo costante non è per forza piccolo: il prodotto dei cicli con limite numerico annidati (anche
+    attraverso le chiamate) che arriva a EXPENSIVE_TRIPS iterazioni dà la classe expensive-constant.
+Un ciclo logaritmico conta come lineare: la classe è sempre un limite superiore.
+'''
+
+CONSTANT, LINEAR, POLYNOMIAL, UNKNOWN = "constant", "linear", "nested-polynomial", "unknown"
+EXPENSIVE = "expensive-constant"
+EXPENSIVE_TRIPS = 10 ** 6   # iterazioni costanti oltre le quali il costo non è più trascurabile
+
+COMPARISON_SWAP = {"LT": "GT", "GT": "LT", "LE": "GE", "GE": "LE", "NEQ": "NEQ"}
+
+
+def cost_class(degree, trips=1):
+    if degree is None:
+        return UNKNOWN
+    if degree == 0:
+        return EXPENSIVE if trips >= EXPENSIVE_TRIPS else CONSTANT
+    return LINEAR if degree == 1 else POLYNOMIAL
+
+
+class CostAnalyzer(SemanticAnalyzer):
+    def __init__(self, ast):
+        super().__init__(ast)
+        self.terms = {}             # funzione -> {(grado dei cicli, funzione chiamata o None, iterazioni
+                                    #              costanti dei cicli che lo contengono)}
+        self.call_graph = {}        # funzione -> funzioni chiamate direttamente
+        self.recursion = {}         # funzione ricorsiva -> funzioni del suo ciclo di chiamate
+        self.degrees = {}           # funzione -> grado del costo (None: sconosciuto)
+        self.trips = {}             # funzione -> massimo prodotto di iterazioni costanti annidate
+        self.loops = []             # (funzione, condizione, iterazioni o None)
+        self.current_function = None
+
+    def analyze_costs(self):
+        # Restituisce la classe di costo di ogni funzione
+        self.stack_symbol_table = [{}]
+        self.block(self.ast, {})
+        self.call_graph = {name: {callee for _, callee, _ in terms if callee is not None}
+                           for name, terms in self.terms.items()}
+        self.recursion = self.find_recursion()
+        for name in self.terms:
+            self.degree(name)
+        return {name: cost_class(degree, self.trips[name]) for name, degree in self.degrees.items()}
+
+    #  Visita: termini di costo di ogni blocco
+
+    def block(self, stmts, consts):
+        # consts: variabili int con valore costante noto in questo punto del blocco
+        terms = set()
+        for stmt in stmts:
+            terms |= self.statement(stmt, consts)
+            self.update_constants(stmt, consts)
+        return terms
+
+    def statement(self, stmt, consts):
+        terms = {(0, None, 1)}
+        for expr in statement_exprs(stmt):
+            terms |= {(0, node[1], 1) for node in walk_expr(expr) if node[0] == "funcall"}
+
+        match stmt:
+            case ("function_def", return_type, name, params, body):
+                self.declare_variable(name, ('function', return_type, params))
+                self.stack_symbol_table.append({})
+                for ptype, pname in params:
+                    self.declare_variable(pname, ptype)
+                prev_function, self.current_function = self.current_function, name
+                self.terms.setdefault(name, set()).update(self.block(body, {}))
+                self.current_function = prev_function
+                self.stack_symbol_table.pop()
+                return set()    # il costo di una funzione conta solo dove viene chiamata
+
+            case ("declare", type_, name, _):
+                self.declare_variable(name, type_)
+
+            case ("declare_array", type_, name, size):
+                self.declare_variable(name, ("array", type_, size))
+
+            case ("funcall", name, _):
+                terms.add((0, name, 1))
+
+            case ("if", _, body, else_body):
+                terms |= self.scoped_block(body, dict(consts))
+                terms |= self.scoped_block(else_body, dict(consts))
+
+            case ("while", cond, body):
+                trip = self.trip_count(cond, body, consts)
+                self.loops.append((self.current_function or "<global>", format_expr(cond), trip and trip[1]))
+                variant = assigned_names(body)
+                inner = terms | self.scoped_block(body, {k: v for k, v in consts.items() if k not in variant})
+                if trip is None:
+                    return {(None, callee, t) for _, callee, t in inner}
+                factor = int(trip[1]) if trip[0] == 0 else 1
+                return {(None if d is None else d + trip[0], callee, t * factor) for d, callee, t in inner}
+
+        return terms
+
+    def scoped_block(self, stmts, consts):
+        self.stack_symbol_table.append({})
+        terms = self.block(stmts, consts)
+        self.stack_symbol_table.pop()
+        return terms
+
+    def update_constants(self, stmt, consts):
+        if block_contains_call([stmt]):
+            consts.clear()  # la chiamata può modificare le variabili globali
+            return
+        for name in assigned_names([stmt]):
+            consts.pop(name, None)
+        match stmt:
+            case ("declare", "TYPE_INT", name, ("int", value)) | ("assign", name, ("int", value)):
+                if self.lookup_variable(name) == "TYPE_INT":
+                    consts[name] = int(value)
+
+    #  Variabili di induzione e numero di iterazioni
+
+    def trip_count(self, cond, body, consts):
+        # Restituisce (grado, descrizione delle iterazioni) oppure None se il ciclo non è riconosciuto
+        if cond[0] != "binop" or cond[1] not in COMPARISON_SWAP:
+            return None
+        _, op, left, right = cond
+        variant = assigned_names(body)
+        if left[0] == "var" and left[1] in variant:
+            var, bound = left[1], right
+        elif right[0] == "var" and right[1] in variant:
+            var, bound, op = right[1], left, COMPARISON_SWAP[op]
+        else:
+            return None
+
+        if not is_pure(bound) or expr_vars(bound) & variant:
+            return None
+        if block_contains_call(body) and any(self.is_global(name) for name in expr_vars(bound) | {var}):
+            return None     # una funzione chiamata nel ciclo potrebbe modificarle
+        if self.variable_type(var) != "TYPE_INT" or self.expr_type(bound) != "TYPE_INT":
+            return None
+
+        step = self.induction_step(var, body)
+        if step is None:
+            return None
+        kind, c = step
+        start = consts.get(var)
+        limit = self.constant_value(bound, consts)
+        bound_text = format_expr(bound)
+
+        if kind == "mul":
+            if op not in ("LT", "LE") or start is None or start <= 0:
+                return None     # partendo da 0 (o da un valore negativo) il ciclo non terminerebbe
+            if limit is not None:
+                count = 0
+                while start < limit or (op == "LE" and start == limit):
+                    start *= c
+                    count += 1
+                return 0, str(count)
+            return 1, f"log{c}({bound_text} / {start})"
+
+        if op in ("LT", "LE") and c < 0 or op in ("GT", "GE") and c > 0 or op == "NEQ" and abs(c) != 1:
+            return None         # il passo si allontana dal limite (o potrebbe scavalcarlo)
+
+        if start is not None and limit is not None:
+            distance = (limit - start) if c > 0 else (start - limit)
+            match op:
+                case "LT" | "GT":
+                    count = max(0, ceil(distance / abs(c)))
+                case "LE" | "GE":
+                    count = max(0, floor(distance / abs(c)) + 1)
+                case _:
+                    if distance < 0:
+                        return None
+                    count = distance
+            return 0, str(count)
+        if op == "NEQ":
+            return None         # senza valori noti il limite potrebbe essere già stato superato
+
+        start_text = var if start is None else str(start)
+        if c > 0:
+            distance = bound_text if start == 0 else f"({bound_text} - {start_text})"
+        else:
+            distance = start_text if limit == 0 else f"({start_text} - {bound_text})"
+        text = distance if abs(c) == 1 else f"{distance} / {abs(c)}"
+        if op in ("LE", "GE"):
+            text += " + 1"
+        return 1, text
+
+    def induction_step(self, var, body):
+        # Unico aggiornamento di var nel ciclo, che deve essere uno statement diretto del corpo
+        updates = 0
+        for stmt in iter_block(body):
+            if stmt[0] in ("if", "while"):     # i blocchi annidati sono visitati da iter_block
+                updates += sum(1 for expr in statement_exprs(stmt) for node in walk_expr(expr)
+                               if node[0] in STEP_NODES and node[1] == var)
+            elif var in assigned_names([stmt]):
+                updates += 1
+        if updates != 1:
+            return None
+        for stmt in body:
+            match stmt:
+                case ("post_increment" | "pre_increment", name) if name == var:
+                    return "add", 1
+                case ("post_decrement" | "pre_decrement", name) if name == var:
+                    return "add", -1
+                case ("assign", name, ("binop", "PLUS", ("var", v), ("int", c))) \
+                     | ("assign", name, ("binop", "PLUS", ("int", c), ("var", v))) if name == v == var:
+                    return ("add", int(c)) if int(c) != 0 else None
+                case ("assign", name, ("binop", "MINUS", ("var", v), ("int", c))) if name == v == var:
+                    return ("add", -int(c)) if int(c) != 0 else None
+                case ("assign", name, ("binop", "TIMES", ("var", v), ("int", c))) \
+                     | ("assign", name, ("binop", "TIMES", ("int", c), ("var", v))) if name == v == var:
+                    return ("mul", int(c)) if int(c) >= 2 else None
+        return None
+
+    #  Supporto
+
+    def constant_value(self, expr, consts):
+        match expr:
+            case ("int", value):
+                return int(value)
+            case ("var", name):
+                return consts.get(name)
+            case ("minus", ("int", value)):
+                return -int(value)
+        return None
+
+    def variable_type(self, name):
+        try:
+            return self.lookup_variable(name)
+        except ValueError:
+            return None
+
+    def is_global(self, name):
+        # True se il nome visibile in questo punto è quello dello scope globale
+        for scope in reversed(self.stack_symbol_table):
+            if name in scope:
+                return scope is self.stack_symbol_table[0]
+        return True
+
+    #  Grafo delle chiamate
+
+    def find_recursion(self):
+        # Componenti fortemente connesse (Tarjan): una funzione è ricorsiva se la sua componente ha
+        # più di un elemento o se chiama sé stessa
+        index, low, stack, on_stack = {}, {}, [], set()
+        recursion = {}
+
+        def visit(name):
+            index[name] = low[name] = len(index)
+            stack.append(name)
+            on_stack.add(name)
+            for callee in self.call_graph.get(name, ()):
+                if callee not in index:
+                    visit(callee)
+                    low[name] = min(low[name], low[callee])
+                elif callee in on_stack:
+                    low[name] = min(low[name], index[callee])
+            if low[name] == index[name]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == name:
+                        break
+                if len(component) > 1 or name in self.call_graph.get(name, ()):
+                    for member in component:
+                        recursion[member] = sorted(component)
+
+        for name in self.call_graph:
+            if name not in index:
+                visit(name)
+        return recursion
+
+    def degree(self, name):
+        if name in self.degrees:
+            return self.degrees[name]
+        self.trips[name] = 1
+        if name in self.recursion or name not in self.terms:
+            self.degrees[name] = None
+            return None
+        result = 0
+        for d, callee, t in self.terms[name]:
+            if d is not None and callee is not None:
+                callee_degree = self.degree(callee)
+                d = None if callee_degree is None else d + callee_degree
+                t *= self.trips[callee]
+            if d is None:
+                result = None
+                break
+            result = max(result, d)
+            self.trips[name] = max(self.trips[name], t)
+        self.degrees[name] = result
+        return result
+
+    def report(self):
+        lines = []
+        for function, cond, trip in self.loops:
+            if trip is None:
+                lines.append(f"{function}: while {cond} has no recognizable bound")
+            else:
+                lines.append(f"{function}: while {cond} runs {trip} times")
+        for name, members in sorted(self.recursion.items()):
+            lines.append(f"{name}: recursive (cycle: {', '.join(members)})")
+        for name, degree in self.degrees.items():
+            cls = cost_class(degree, self.trips[name])
+            if cls == EXPENSIVE:
+                suffix = f" ({self.trips[name]} iterations)"
+            else:
+                suffix = f" (degree {degree})" if degree is not None and degree > 1 else ""
+            lines.append(f"{name}: {cls}{suffix}")
+        return lines
+
+
+if __name__ == "__main__":
+    from lexer import lexer
+    from parser import Parser
+
+    codice = '''
+    int fattoriale(int n) {
+        if (n <= 1) {
+            return 1;
+        }
+        return n * fattoriale(n - 1);
+    }
+
+    int somma(int n) {
+        int i = 0;
+        int s = 0;
+        while (i < n) {
+            s = s + i;
+            i = i + 1;
+        }
+        return s;
+    }
+
+    int coppie(int n) {
+        int i = 0;
+        int c = 0;
+        while (i < n) {
+            c = c + somma(i);
+            i++;
+        }
+        return c;
+    }
+
+    int main() {
+        int n;
+        cin >> n;
+        int k = 1;
+        while (k < 1000) {
+            k = k * 2;
+        }
+        cout << coppie(n) << " " << fattoriale(5) << " " << k << endl;
+        return 0;
+    }
+    '''
+
+    ast = Parser(lexer(codice)).parse()
+    SemanticAnalyzer(ast).analyze()
+    analyzer = CostAnalyzer(ast)
+    print(analyzer.analyze_costs())
+    for line in analyzer.report():
+        print(line)
@@ -0,0 +1,247 @@
+import asyncio
+import hashlib
+import io
+import json
+import math
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from daemon_client import DEFAULT_SOCKET
+from interpreter import Interpreter
+from rope import plain
+from runner import compile_source
+
+
+'''Cosa fa:
+Server di lunga durata che tiene in memoria la pipeline (moduli già importati) e una cache LRU dei
+programmi compilati, e accetta richieste di esecuzione su un socket Unix locale (protocollo descritto
+in daemon_client.py).
+L'event loop gestisce le connessioni; ogni programma gira su un thread del pool con il proprio
+Interpreter e i propri stream, e l'output viene inoltrato al client a blocchi mentre il programma gira.
+Limiti per richiesta: tempo totale (secondi), statement eseguiti e caratteri stampati. Tempo e
+statement sono controllati dall'interprete stesso, così anche un ciclo infinito senza I/O si ferma.
+'''
+
+DEFAULT_LIMITS = {"time": 10.0, "steps": None, "output": 1 << 24}   # None: nessun limite
+CHECK_EVERY = 1024      # ogni quanti statement controllare scadenza e cancellazione
+
+
+class CompileCache:
+    def __init__(self, capacity=256):
+        self.capacity = capacity
+        self.entries = OrderedDict()    # sha256 del sorgente -> AST analizzato
+        self.lock = threading.Lock()
+        self.stats = {"compiled": 0, "cached": 0}
+
+    def get(self, source):
+        key = hashlib.sha256(source.encode()).hexdigest()
+        with self.lock:
+            ast = self.entries.get(key)
+            if ast is not None:
+                self.entries.move_to_end(key)
+                self.stats["cached"] += 1
+                return ast
+        ast = compile_source(source)    # fuori dal lock: compilazioni diverse procedono insieme
+        with self.lock:
+            self.entries[key] = ast
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+            self.stats["compiled"] += 1
+        return ast
+
+
+class LimitedInterpreter(Interpreter):
+    # Interprete che si interrompe oltre il numero massimo di statement, dopo la scadenza
+    # o quando il client si disconnette
+    def __init__(self, ast, stdin, stdout, max_steps=None, deadline=None):
+        super().__init__(ast, stdin, stdout)
+        self.max_steps = math.inf if max_steps is None else max_steps
+        self.deadline = math.inf if deadline is None else deadline
+        self.steps = 0
+        self.cancelled = False
+
+    def tick(self):
+        self.steps += 1
+        if self.steps > self.max_steps:
+            raise RuntimeError(f"Step limit exceeded ({self.max_steps} statements)")
+        if self.steps % CHECK_EVERY == 0:
+            if self.cancelled:
+                raise RuntimeError("Run cancelled")
+            if time.monotonic() > self.deadline:
+                raise RuntimeError("Time limit exceeded")
+
+    def execute(self, node, current_function_returntype=None):
+        self.tick()
+        return super().execute(node, current_function_returntype)
+
+    def eval_cond(self, cond):
+        self.tick()     # anche un while con corpo vuoto consuma statement
+        return super().eval_cond(cond)
+
+
+class OutputStream:
+    # stdout del thread di esecuzione: ogni write viene consegnata alla coda dell'event loop
+    def __init__(self, loop, queue, limit=None):
+        self.loop = loop
+        self.queue = queue
+        self.limit = limit
+        self.size = 0
+
+    def write(self, text):
+        self.size += len(text)
+        if self.limit is not None and self.size > self.limit:
+            raise RuntimeError(f"Output limit exceeded ({self.limit} characters)")
+        self.loop.call_soon_threadsafe(self.queue.put_nowait, text)
+
+    def flush(self):
+        pass
+
+
+class Daemon:
+    def __init__(self, workers=None, cache_size=256):
+        self.cache = CompileCache(cache_size)
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.requests = 0
+
+    async def serve(self, path=DEFAULT_SOCKET):
+        if os.path.exists(path):
+            os.unlink(path)     # socket rimasto da un'esecuzione precedente
+        return await asyncio.start_unix_server(self.handle_connection, path, limit=2 ** 26)
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while line := await reader.readline():
+                try:
+                    request = json.loads(line)
+                except json.JSONDecodeError as e:
+                    await self.send(writer, {"error": f"ValueError: Invalid request: {e}"})
+                    continue
+                await self.handle_request(request, writer)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def handle_request(self, request, writer):
+        self.requests += 1
+        try:
+            limits = self.limits(request)
+            if "source" not in request:
+                raise ValueError("missing 'source'")
+            source, stdin_text = request["source"], request.get("stdin", "")
+            if not isinstance(source, str) or not isinstance(stdin_text, str):
+                raise ValueError("'source' and 'stdin' must be strings")
+        except (KeyError, TypeError, ValueError) as e:
+            await self.send(writer, {"error": f"ValueError: Invalid request: {e}"})
+            return
+
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()     # testi stampati dal programma; None quando l'esecuzione termina
+        deadline = None if limits["time"] is None else time.monotonic() + limits["time"]
+        job = Job(self.cache, source, stdin_text, OutputStream(loop, queue, limits["output"]),
+                  limits["steps"], deadline)
+        future = loop.run_in_executor(self.pool, job.run)
+        future.add_done_callback(lambda _: queue.put_nowait(None))
+
+        try:
+            finished = False
+            while not finished:
+                pieces = [await queue.get()]
+                while not queue.empty():    # unisce i cout arrivati nel frattempo in un solo messaggio
+                    pieces.append(queue.get_nowait())
+                if pieces[-1] is None:
+                    finished = True
+                    pieces.pop()
+                if pieces:
+                    await self.send(writer, {"out": "".join(pieces)})
+        except ConnectionError:
+            job.cancel()
+            await asyncio.wait([future])
+            raise
+
+        try:
+            reply = {"exit": exit_value(future.result())}
+        except Exception as e:
+            reply = {"error": f"{type(e).__name__}: {e}"}
+        await self.send(writer, reply)
+
+    def limits(self, request):
+        if not isinstance(request, dict):
+            raise ValueError("request must be a JSON object")
+        if not isinstance(request.get("limits", {}), dict):
+            raise ValueError("'limits' must be a JSON object")
+        limits = dict(DEFAULT_LIMITS)
+        for name, value in request.get("limits", {}).items():
+            if name not in limits:
+                raise ValueError(f"unknown limit '{name}'")
+            if value is not None and (not isinstance(value, (int, float)) or value < 0):
+                raise ValueError(f"limit '{name}' must be a non-negative number")
+            limits[name] = value
+        return limits
+
+    async def send(self, writer, message):
+        try:
+            line = json.dumps(message)
+        except (TypeError, ValueError) as e:
+            # il client riceve comunque una risposta invece di una connessione chiusa
+            line = json.dumps({"error": f"{type(e).__name__}: {e}"})
+        writer.write((line + "\n").encode())
+        await writer.drain()
+
+
+def exit_value(value):
+    # Il valore di ritorno di main in forma serializzabile: le stringhe (anche Rope) diventano str
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    return str(value)
+
+
+class Job:
+    def __init__(self, cache, source, stdin_text, stdout, max_steps, deadline):
+        self.cache = cache
+        self.source = source
+        self.stdin_text = stdin_text
+        self.stdout = stdout
+        self.max_steps = max_steps
+        self.deadline = deadline
+        self.interpreter = None
+        self.cancelled = False
+
+    def run(self):
+        # Eseguito su un thread del pool: stesso percorso di runner.run_program
+        ast = self.cache.get(self.source)
+        if self.cancelled:
+            raise RuntimeError("Run cancelled")
+        self.interpreter = LimitedInterpreter(ast, io.StringIO(self.stdin_text), self.stdout,
+                                              self.max_steps, self.deadline)
+        for stmt in ast:
+            self.interpreter.execute(stmt)
+        return plain(self.interpreter.eval_expr(("funcall", "main", [])))
+
+    def cancel(self):
+        self.cancelled = True
+        if self.interpreter is not None:
+            self.interpreter.cancelled = True
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_SOCKET
+
+    async def main():
+        server = await Daemon().serve(path)
+        print(f"Listening on {path}", file=sys.stderr)
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if os.path.exists(path):
+            os.unlink(path)
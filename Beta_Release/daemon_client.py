@@ -0,0 +1,96 @@
+import json
+import os
+import socket
+import sys
+
+
+'''Cosa fa:
+Client leggero del daemon (daemon.py): invia sorgente, stdin e limiti sul socket Unix e riproduce
+l'output man mano che arriva. Non importa lexer, parser né interprete, quindi si avvia in pochi
+millisecondi; il comportamento è quello di `python runner.py programma.cpp`: l'output va su stdout,
+un errore viene stampato su stderr come `Tipo: messaggio` con codice di uscita 1.
+Lo stdin viene letto tutto prima dell'invio (se è un terminale il programma riceve un input vuoto).
+Protocollo (una riga JSON per messaggio, più richieste possibili sulla stessa connessione):
+  client -> daemon: {"source": codice, "stdin": testo, "limits": {"time": s, "steps": n, "output": caratteri}}
+  daemon -> client: {"out": testo} per ogni blocco di output, infine {"exit": valore} oppure {"error": messaggio}
+'''
+
+DEFAULT_SOCKET = os.environ.get("TNF_SOCKET") or f"/tmp/tnf-{os.getuid()}.sock"
+
+
+class DaemonClient:
+    def __init__(self, path=DEFAULT_SOCKET):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(path)
+        self.stream = self.sock.makefile("r", encoding="utf-8")
+
+    def run(self, source, stdin_text="", limits=None, write=None):
+        # Restituisce il messaggio finale ({"exit": ...} o {"error": ...}); write riceve l'output a blocchi
+        request = {"source": source, "stdin": stdin_text, "limits": limits or {}}
+        self.sock.sendall(json.dumps(request).encode() + b"\n")
+        for line in self.stream:
+            message = json.loads(line)
+            if "out" not in message:
+                return message
+            if write is not None:
+                write(message["out"])
+        raise ConnectionError("Daemon closed the connection")
+
+    def close(self):
+        self.stream.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+USAGE = "Usage: python daemon_client.py [--socket PATH] [--time S] [--steps N] [--output N] <program.cpp>"
+
+LIMIT_OPTIONS = {"--time": ("time", float), "--steps": ("steps", int), "--output": ("output", int)}
+
+
+def parse_arguments(argv):
+    # Niente argparse: importarlo costerebbe più di tutto il resto dell'avvio del client
+    path, limits, program = DEFAULT_SOCKET, {}, None
+    pending = list(argv)
+    while pending:
+        arg = pending.pop(0)
+        if arg == "--socket" and pending:
+            path = pending.pop(0)
+        elif arg in LIMIT_OPTIONS and pending:
+            name, convert = LIMIT_OPTIONS[arg]
+            try:
+                limits[name] = convert(pending.pop(0))
+            except ValueError:
+                sys.exit(USAGE)
+        elif program is None and not arg.startswith("--"):
+            program = arg
+        else:
+            sys.exit(USAGE)
+    if program is None:
+        sys.exit(USAGE)
+    return path, limits, program
+
+
+if __name__ == "__main__":
+    socket_path, limits, program = parse_arguments(sys.argv[1:])
+    with open(program, encoding="utf-8") as f:
+        codice = f.read()
+    stdin_text = "" if sys.stdin.isatty() else sys.stdin.read()
+
+    def write(text):
+        sys.stdout.write(text)
+        sys.stdout.flush()
+
+    try:
+        with DaemonClient(socket_path) as client:
+            result = client.run(codice, stdin_text, limits, write)
+    except OSError as e:
+        sys.exit(f"Cannot reach daemon at {socket_path}: {e}")
+    if "error" in result:
+        print(result["error"], file=sys.stderr)
+        sys.exit(1)
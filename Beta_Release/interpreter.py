@@ -1,7 +1,28 @@
+import operator
+import sys
+from array import array
+
+from rope import Rope, concat
+
+
+ARRAY_TYPECODES = {"TYPE_INT": "q", "TYPE_FLOAT": "d"}  # elementi a 64 bit, senza oggetti Python per valore
+
+EVENTS = ("function_enter", "function_exit", "statement", "io_wait", "scope_push", "scope_pop")
+
+COMPARISONS = {
+    "EQ": operator.eq, "NEQ": operator.ne,
+    "LT": operator.lt, "GT": operator.gt, "LE": operator.le, "GE": operator.ge,
+}
+
+
 class Interpreter:
-    def __init__(self, ast):
+    def __init__(self, ast, stdin=None, stdout=None):
         self.ast = ast
         self.env_stack = [{}]
+        self.stdin = stdin      # stream da cui legge cin (None: sys.stdin al momento della lettura)
+        self.stdout = stdout    # stream su cui scrive cout (None: sys.stdout al momento della scrittura)
+        self.cond_cache = {}    # id(condizione) -> (condizione, test compilato)
+        self.listeners = {}     # evento -> funzioni registrate con subscribe
 
     def run(self):
         for stmt in self.ast:
@@ -30,6 +51,149 @@ class Interpreter:
             raise RuntimeError(f"Variable '{name}' already declared")
         env[name] = (tipo, value)
 
+    def store_inputs(self, vars_, raw_inputs, indices=None):
+        # indices: indici degli elementi di array già calcolati (dall'AsyncInterpreter), allineati a vars_
+        if len(raw_inputs) < len(vars_):  # Verifica che ci siano abbastanza input
+            raise RuntimeError(
+                f"Expected {len(vars_)} inputs, got {len(raw_inputs)}")
+
+        for position, (name, text) in enumerate(zip(vars_, raw_inputs)):  # Associa ogni input a una variabile
+            target = name
+            if isinstance(target, tuple):  # Elemento di array: cin >> a[i]
+                _, name, index = target
+            tipo, _ = self.lookup(name)   # Recupera il tipo della variabile
+            if isinstance(tipo, tuple):
+                tipo = tipo[1]            # Tipo degli elementi dell'array
+            try:  # Prova a convertire in base al tipo
+                value = int(text) if tipo == "TYPE_INT" else \
+                    float(text) if tipo == "TYPE_FLOAT" else text
+            except ValueError:  # Errore se la conversione fallisce
+                raise RuntimeError(
+                    f"Cannot assign '{text}' to {tipo} variable '{name}'")
+            if isinstance(target, tuple):
+                index = self.eval_expr(index) if indices is None else indices[position]
+                self.store_element(name, index, value)
+            else:
+                self.assign(name, (tipo, value))  # Assegna il valore convertito alla variabile
+
+    #  Array a dimensione fissa: buffer array('q') / array('d')
+
+    def declare_array(self, name, tipo, size):
+        self.declare(name, ("array", tipo), array(ARRAY_TYPECODES[tipo], bytes(8 * size)))
+
+    def check_index(self, name, buffer, index):
+        index = int(index)  # la divisione tra int produce un float nell'interprete
+        if not 0 <= index < len(buffer):
+            raise RuntimeError(f"Index {index} out of bounds for array '{name}' of size {len(buffer)}")
+        return index
+
+    def store_element(self, name, index, value):
+        (_, tipo), buffer = self.lookup(name)
+        index = self.check_index(name, buffer, index)
+        if tipo == "TYPE_INT" and isinstance(value, float):
+            # Un int tipato può valere un float (la divisione tra int produce un float): si accetta
+            # solo se è intero, senza troncare in silenzio
+            if not value.is_integer():
+                raise RuntimeError(f"Cannot store non-integer value {value} in int array '{name}'")
+            value = int(value)
+        try:
+            buffer[index] = value
+        except OverflowError:
+            raise RuntimeError(f"Value {value} out of range for element of int array '{name}'")
+
+    def resolve_function(self, name, argc):
+        # Recupera la definizione della funzione e controlla il numero di argomenti
+        func = self.lookup(name)
+        if func[0] != "function":
+            raise RuntimeError(f"'{name}' is not a function")
+        _, return_type, params, body = func
+        if len(params) != argc:
+            raise RuntimeError(f"Function '{name}' expects {len(params)} args, got {argc}")
+        return return_type, params, body
+
+    def bind_arguments(self, params, arg_values):
+        # Crea l'ambiente locale della chiamata associando i parametri ai valori
+        new_env = {}
+        for (ptype, pname), value in zip(params, arg_values):
+            new_env[pname] = (ptype, value)
+        return new_env
+
+    def missing_return(self, name, return_type):
+        # Il corpo è terminato senza return: lecito solo per le funzioni VOID
+        if return_type in ("TYPE_INT", "TYPE_FLOAT", "TYPE_STRING", "TYPE_BOOL"):
+            raise RuntimeError(
+                f"Function '{name}' declared as {return_type[5:].lower()} but missing return statement")
+        return None
+
+    def binop(self, op, l, r):
+        match op:
+            case "PLUS":
+                if isinstance(l, (str, Rope)) or isinstance(r, (str, Rope)):
+                    return concat(l, r)
+                return l + r
+            case "MINUS": return l - r
+            case "TIMES": return l * r
+            case "BITAND":  # prodotto dall'ottimizzatore per x % 2^k: r = 2^k - 1
+                return l & r if isinstance(l, int) else l % (r + 1)
+            case "DIVIDE": return l / r
+            case "MODULE": return l % r
+            case "NEQ": return l != r
+            case "EQ": return l == r
+            case "LT": return l < r
+            case "GT": return l > r
+            case "LE": return l <= r
+            case "GE": return l >= r
+        raise RuntimeError(f"Unsupported operator {op}")
+
+    def truth(self, op, value):
+        # Valore di verità di un operando di && / ||
+        if isinstance(value, (str, Rope)):
+            raise RuntimeError(f"Cannot apply logical {op} to string operands")
+        return bool(value)
+
+    #  Condizioni di if/while compilate in test diretti
+
+    def eval_cond(self, cond):
+        # Il nodo è conservato nella cache insieme al test, così il suo id non può essere riusato
+        cached = self.cond_cache.get(id(cond))
+        if cached is None:
+            cached = self.cond_cache[id(cond)] = (cond, self.compile_cond(cond))
+        return cached[1]()
+
+    def compile_cond(self, cond):
+        # Restituisce una funzione senza argomenti che calcola direttamente il valore di verità
+        # della condizione, con corto circuito e senza convertire i risultati intermedi in int
+        match cond:
+            case ("binop", "AND", left, right):
+                l, r = self.compile_logic_operand("AND", left), self.compile_logic_operand("AND", right)
+                return lambda: l() and r()
+            case ("binop", "OR", left, right):
+                l, r = self.compile_logic_operand("OR", left), self.compile_logic_operand("OR", right)
+                return lambda: l() or r()
+            case ("not", inner):
+                test = self.compile_cond(inner)
+                return lambda: not test()
+            case ("binop", op, ("var", name), (("int" | "float" | "bool"), _) as const) if op in COMPARISONS:
+                compare, lookup, value = COMPARISONS[op], self.lookup, self.eval_expr(const)
+                return lambda: compare(lookup(name)[1], value)
+            case ("binop", op, ("var", left), ("var", right)) if op in COMPARISONS:
+                compare, lookup = COMPARISONS[op], self.lookup
+                return lambda: compare(lookup(left)[1], lookup(right)[1])
+            case ("binop", op, left, right) if op in COMPARISONS:
+                compare, eval_expr = COMPARISONS[op], self.eval_expr
+                return lambda: compare(eval_expr(left), eval_expr(right))
+            case ("bool", value):
+                value = self.eval_expr(cond)
+                return lambda: value
+        eval_expr = self.eval_expr
+        return lambda: eval_expr(cond)
+
+    def compile_logic_operand(self, op, expr):
+        if expr[0] == "binop" and (expr[1] in COMPARISONS or expr[1] in ("AND", "OR")) or expr[0] == "not":
+            return self.compile_cond(expr)  # produce già un bool: nessun controllo sulle stringhe
+        truth, eval_expr = self.truth, self.eval_expr
+        return lambda: truth(op, eval_expr(expr))
+
     def execute(self, node, current_function_returntype=None):
         match node:
             case ("function_def", return_type, name, params, body):
@@ -39,6 +203,13 @@ class Interpreter:
                 value = self.eval_expr(expr) if expr else None
                 self.declare(name, tipo, value)
 
+            case ("declare_array", tipo, name, size):
+                self.declare_array(name, tipo, size)
+
+            case ("assign_index", name, index, expr):
+                value = self.eval_expr(expr)
+                self.store_element(name, self.eval_expr(index), value)
+
             case ("assign", name, expr):
                 value = self.eval_expr(expr)
                 _, _ = self.lookup(name)
@@ -47,7 +218,7 @@ class Interpreter:
             case ("if", cond, body, else_body):
                 self.env_stack.append({})  # Aggiunge un nuovo ambiente locale per l'if
                 try:
-                    branch = body if self.eval_expr(cond) else else_body
+                    branch = body if self.eval_cond(cond) else else_body
                     for stmt in branch:
                         result = self.execute(stmt, current_function_returntype)
                         if isinstance(result, tuple) and result[0] == "return":
@@ -56,7 +227,7 @@ class Interpreter:
                     self.env_stack.pop()  # Rimuove l'ambiente locale dopo l'esecuzione dell'if/else
 
             case ("while", cond, body):
-                while self.eval_expr(cond):
+                while self.eval_cond(cond):
                     self.env_stack.append({})
                     try:
                         for stmt in body:
@@ -69,24 +240,14 @@ class Interpreter:
             case ("cout", expr):
                 output = self.eval_expr(expr)
                 if output is not None:
-                    print(output, end="")
+                    self.write_output(str(output))
 
             case ("cin", vars_):   # Gestisce l'input da tastiera per più variabili
-                raw_inputs = input().strip().split()  # Legge la riga e la divide in parole (valori)
-
-                if len(raw_inputs) < len(vars_):  # Verifica che ci siano abbastanza input
-                    raise RuntimeError(
-                        f"Expected {len(vars_)} inputs, got {len(raw_inputs)}")
-
-                for name, text in zip(vars_, raw_inputs):  # Associa ogni input a una variabile
-                    tipo, _ = self.lookup(name)   # Recupera il tipo della variabile
-                    try:  # Prova a convertire in base al tipo
-                        value = int(text) if tipo == "TYPE_INT" else \
-                            float(text) if tipo == "TYPE_FLOAT" else text
-                    except ValueError:  # Errore se la conversione fallisce
-                        raise RuntimeError(
-                            f"Cannot assign '{text}' to {tipo} variable '{name}'")
-                    self.assign(name, (tipo, value))  # Assegna il valore convertito alla variabile
+                line = self.read_input()  # Legge la riga dallo stream dell'istanza
+                if not line:
+                    raise EOFError("EOF when reading a line")
+                raw_inputs = line.strip().split()  # Divide la riga in parole (valori)
+                self.store_inputs(vars_, raw_inputs)
 
             case ("funcall", name, args):
                 self.eval_expr(("funcall", name, args))
@@ -129,6 +290,10 @@ class Interpreter:
             case ("var", name):
                 return self.lookup(name)[1]
 
+            case ("index", name, index):  # Lettura diretta dal buffer, subito dopo le variabili
+                buffer = self.lookup(name)[1]
+                return buffer[self.check_index(name, buffer, self.eval_expr(index))]
+
             case ("concat", expr, next_expr):
                 return str(self.eval_expr(expr)) + str(self.eval_expr(next_expr))
 
@@ -139,68 +304,124 @@ class Interpreter:
 
             case ('minus', inner): return -self.eval_expr(inner)
 
+            case ('binop', ("AND" | "OR") as op, left, right):
+                # Corto circuito: il secondo operando si valuta solo se il primo non decide il risultato
+                l = self.truth(op, self.eval_expr(left))
+                if l == (op == "OR"):
+                    return int(l)
+                return int(self.truth(op, self.eval_expr(right)))
+
             case ('binop', op, left, right):
-                l = self.eval_expr(left)
-                r = self.eval_expr(right)
-
-                match op:
-                    case "PLUS":
-                        if isinstance(l, str) or isinstance(r, str):
-                            return str(l) + str(r)
-                        return l + r
-                    case "MINUS": return l - r
-                    case "TIMES": return l * r
-                    case "DIVIDE": return l / r
-                    case "MODULE": return l % r
-                    case "AND":
-                        if isinstance(l, str) or isinstance(r, str):
-                            raise RuntimeError("Cannot apply logical AND to string operands")
-                        return int(bool(l) and bool(r))
-                    case "OR":
-                        if isinstance(l, str) or isinstance(r, str):
-                            raise RuntimeError("Cannot apply logical OR to string operands")
-                        return int(bool(l) or bool(r))
-                    case "NEQ": return l != r
-                    case "EQ": return l == r
-                    case "LT": return l < r
-                    case "GT": return l > r
-                    case "LE": return l <= r
-                    case "GE": return l >= r
-                raise RuntimeError(f"Unsupported operator {op} in expression {expr}")
+                return self.binop(op, self.eval_expr(left), self.eval_expr(right))
 
             case ("funcall", name, args):
-                func = self.lookup(name)
-                if func[0] != "function":
-                    raise RuntimeError(f"'{name}' is not a function")
-                _, return_type, params, body = func
-                if len(params) != len(args):
-                    raise RuntimeError(f"Function '{name}' expects {len(params)} args, got {len(args)}")
-                arg_values = [self.eval_expr(arg) for arg in args]
-
-                new_env = {}
-                for (ptype, pname), value in zip(params, arg_values):
-                    new_env[pname] = (ptype, value)
-
-                self.env_stack.append(new_env)
-
-                try:
-                    for stmt in body:
-                        result = self.execute(stmt, return_type)
-                        if isinstance(result, tuple) and result[0] == "return":
-                            return result[1]
-                finally:
-                    self.env_stack.pop()  # Rimuove l'ambiente locale dopo l'esecuzione della funzione
-
-                if return_type == "VOID":
-                    return None
-                if return_type in ("TYPE_INT", "TYPE_FLOAT", "TYPE_STRING", "TYPE_BOOL"):
-                    raise RuntimeError(
-                        f"Function '{name}' declared as {return_type[5:].lower()} but missing return statement")
+                return self.call_function(name, [self.eval_expr(arg) for arg in args])
 
             case _:
                 raise RuntimeError(f"Invalid expression: {expr}")
 
-
+    def call_function(self, name, arg_values):
+        return_type, params, body = self.resolve_function(name, len(arg_values))
+        self.env_stack.append(self.bind_arguments(params, arg_values))
+
+        try:
+            for stmt in body:
+                result = self.execute(stmt, return_type)
+                if isinstance(result, tuple) and result[0] == "return":
+                    return result[1]
+        finally:
+            self.env_stack.pop()  # Rimuove l'ambiente locale dopo l'esecuzione della funzione
+
+        return self.missing_return(name, return_type)
+
+    def read_input(self):
+        return (self.stdin or sys.stdin).readline()
+
+    def write_output(self, text):
+        (self.stdout or sys.stdout).write(text)
+
+    #  Eventi: le versioni strumentate dei metodi vengono installate sull'istanza solo per gli eventi
+    #  che hanno almeno un ascoltatore, quindi senza ascoltatori l'esecuzione non cambia
+
+    def subscribe(self, event, callback):
+        # callback(evento, *dati): function_enter(nome, argomenti), function_exit(nome, valore),
+        # statement(nodo), io_wait("cin" | "cout", "begin" | "end"), scope_push/scope_pop(profondità)
+        if event not in EVENTS:
+            raise ValueError(f"Unknown event '{event}'")
+        self.listeners.setdefault(event, []).append(callback)
+        self.install_hooks()
+
+    def unsubscribe(self, event, callback):
+        listeners = self.listeners.get(event, [])
+        if callback not in listeners:
+            raise ValueError(f"Callback not subscribed to '{event}'")
+        listeners.remove(callback)
+        if not listeners:
+            del self.listeners[event]
+        self.install_hooks()
+
+    def emit(self, event, *data):
+        for callback in self.listeners.get(event, ()):
+            callback(event, *data)
+
+    def install_hooks(self):
+        self.hook("execute", self.traced_execute, "statement")
+        self.hook("call_function", self.traced_call_function, "function_enter", "function_exit")
+        self.hook("read_input", self.traced_read_input, "io_wait")
+        self.hook("write_output", self.traced_write_output, "io_wait")
+        scoped = "scope_push" in self.listeners or "scope_pop" in self.listeners
+        if scoped and not isinstance(self.env_stack, ScopeStack):
+            self.env_stack = ScopeStack(self.env_stack, self.emit)
+        elif not scoped and isinstance(self.env_stack, ScopeStack):
+            self.env_stack = list(self.env_stack)
+
+    def hook(self, method, traced, *events):
+        if any(event in self.listeners for event in events):
+            setattr(self, method, traced)
+        else:
+            self.__dict__.pop(method, None)     # torna il metodo della classe
+
+    def traced_execute(self, node, current_function_returntype=None):
+        self.emit("statement", node)
+        return type(self).execute(self, node, current_function_returntype)
+
+    def traced_call_function(self, name, arg_values):
+        self.emit("function_enter", name, arg_values)
+        result = None
+        try:
+            result = type(self).call_function(self, name, arg_values)
+            return result
+        finally:
+            self.emit("function_exit", name, result)
+
+    def traced_read_input(self):
+        self.emit("io_wait", "cin", "begin")
+        try:
+            return type(self).read_input(self)
+        finally:
+            self.emit("io_wait", "cin", "end")
+
+    def traced_write_output(self, text):
+        self.emit("io_wait", "cout", "begin")
+        try:
+            type(self).write_output(self, text)
+        finally:
+            self.emit("io_wait", "cout", "end")
+
+
+class ScopeStack(list):
+    # Pila degli scope che notifica ogni push e pop; sostituisce la lista solo finché ci sono ascoltatori
+    def __init__(self, scopes, emit):
+        super().__init__(scopes)
+        self.emit = emit
+
+    def append(self, env):
+        super().append(env)
+        self.emit("scope_push", len(self))
+
+    def pop(self):
+        self.emit("scope_pop", len(self))
+        return super().pop()
 
 
 if __name__ == "__main__":
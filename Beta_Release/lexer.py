@@ -1,4 +1,6 @@
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 
 # Token specification (regex pattern, token name)
 '''
@@ -7,7 +9,7 @@ Qui elenchi tutti i tipi di token che il lexer deve riconoscere, ciascuno associ
 L’ordine è importante: i token con pattern più lunghi (come == o &&) vanno prima di quelli più corti (come = o &).
 '''
 
-TOKEN_SPECIFICATION = [
+TOKEN_SPECIFICATION = (
     ("FLOAT",       r'\d+\.\d+'),        # float number -> \d+\.\d+ una o più cifre seguite da un punto e da 1 o più cifre
     ("INT",         r'\d+'),             # int number -> \d+ una o più cifre
     ("STRING",      r'"[^"\n]*"'),       # Stringa delimitata da due virgolette -> [^"\n] che non siano virgolette o a capo, * che sia 0 o più, " " che siano delimitate da virgolette
@@ -36,21 +38,23 @@ TOKEN_SPECIFICATION = [
     ("RPAREN",      r'\)'),              # ) parentesi chiusa
     ("LBRACE",      r'\{'),              # { parentesi aperta
     ("RBRACE",      r'\}'),              # } parentesi chiusa
+    ("LBRACKET",    r'\['),              # [ parentesi quadra aperta (indice di array)
+    ("RBRACKET",    r'\]'),              # ] parentesi quadra chiusa
     ("SEMICOLON",   r';'),               # ;
     ("COMMA",       r','),               # ,
     ("SKIP",        r'[ \t]+'),          # Ignora gli spazi e le tabulazioni, non significative in C++
     ("NEWLINE",     r'\n'),              # Nuova linea
     ("MISMATCH",    r'.'),               # qualsiasi altro carattere
-]
+)
 
 
 '''Cosa fa:
 Elenca le parole chiave C++ che il lexer dovrà distinguere dagli identificatori normali (variabili, funzioni).
 '''
 # Reserved keywords (C++ subset)
-KEYWORDS = {
+KEYWORDS = frozenset({
     "if", "else", "while", "return", "int", "float", "string", "cin", "cout", "void", "bool", "endl", "true", "false", "for", "do"
-}
+})
 
 
 '''Cosa fa:
@@ -58,25 +62,29 @@ Costruisce un’unica grande regex, che unisce tutte le regex dei token, assegna
 get_token è una funzione che cerca il primo token nella stringa in una data posizione.
 '''
 # Compile regex
-token_parts = []  # Crea una lista vuota che conterrà le parti di regex, una per ogni tipo di token
+def build_token_regex(specification):
+    token_parts = []  # Crea una lista vuota che conterrà le parti di regex, una per ogni tipo di token
 
-for pair in TOKEN_SPECIFICATION:  # Per ogni coppia (nome_token, regex) nella lista delle specifiche
-    part = '(?P<%s>%s)' % pair    # Crea una stringa regex con un "named group":
-                                  # - %s viene sostituito dal nome del token (es: 'ID', 'NUMBER', ...)
-                                  # - %s viene sostituito dalla regex che trova quel token
-                                  # Esempio: ('ID', r'[a-zA-Z_]\w*') diventa '(?P<ID>[a-zA-Z_]\w*)'
-    token_parts.append(part)      # Aggiungi questa stringa alla lista
+    for pair in specification:        # Per ogni coppia (nome_token, regex) nella lista delle specifiche
+        part = '(?P<%s>%s)' % pair    # Crea una stringa regex con un "named group":
+                                      # - %s viene sostituito dal nome del token (es: 'ID', 'NUMBER', ...)
+                                      # - %s viene sostituito dalla regex che trova quel token
+                                      # Esempio: ('ID', r'[a-zA-Z_]\w*') diventa '(?P<ID>[a-zA-Z_]\w*)'
+        token_parts.append(part)      # Aggiungi questa stringa alla lista
 
-token_regex = '|'.join(token_parts)  # Unisci tutte le parti in una sola grande regex,
-                                     # separandole con il simbolo | (che in regex vuol dire "oppure")
-                                     # Esempio: '(?P<ID>[a-zA-Z_]\w*)|(?P<NUMBER>\d+)|(?P<PLUS>\+)'
+    token_regex = '|'.join(token_parts)  # Unisci tutte le parti in una sola grande regex,
+                                         # separandole con il simbolo | (che in regex vuol dire "oppure")
+                                         # Esempio: '(?P<ID>[a-zA-Z_]\w*)|(?P<NUMBER>\d+)|(?P<PLUS>\+)'
+    return re.compile(token_regex)       # Compila la regex in un oggetto "regex"
 
-get_token = re.compile(token_regex).match  # Compila la regex in un oggetto "regex"
-                                           # .match è un metodo che, dato un testo e una posizione,
-                                           # cerca se almeno una di queste regex combacia con l'inizio del testo
 
-def lexer(code):
-    line_num = 1            # tiene traccia del numero di riga (utile per errori).
+# Le variabili locali della funzione non restano a livello di modulo: l'unico stato condiviso è la regex
+# compilata, immutabile e quindi utilizzabile da più thread contemporaneamente.
+get_token = build_token_regex(TOKEN_SPECIFICATION).match  # .match è un metodo che, dato un testo e una posizione,
+                                                          # cerca se almeno una di queste regex combacia con l'inizio del testo
+
+def lexer(code, first_line=1):
+    line_num = first_line   # tiene traccia del numero di riga (utile per errori); first_line serve ai frammenti.
     tokens = []             # è la lista dove salverai i token trovati.
     tok = get_token(code)    # cerca il prossimo token a partire dalla posizione pos.
     while tok is not None:   # Entra in un ciclo che continua finché trova token (mo è il match object).
@@ -105,6 +113,45 @@ def lexer(code):
     return tokens
 
 
+'''Cosa fa:
+Lexing parallelo per sorgenti molto grandi: il codice viene diviso in frammenti subito dopo un a capo
+e i frammenti vengono analizzati da un pool di processi, poi i token vengono riuniti in ordine.
+Dividere dopo un '\n' è sempre sicuro: nessun token attraversa un a capo (le stringhe non possono
+contenerlo e i commenti // finiscono lì), quindi il taglio non cade mai dentro una stringa o un commento.
+Ogni frammento riceve il numero della sua prima riga, così i token (e gli errori) hanno le righe giuste.
+'''
+def split_source(code, chunks):
+    # Restituisce coppie (frammento, numero della prima riga) di dimensione simile
+    size = max(1, len(code) // chunks)
+    pieces = []
+    start, line = 0, 1
+    while start < len(code):
+        end = code.find("\n", start + size)
+        end = len(code) if end == -1 else end + 1
+        pieces.append((code[start:end], line))
+        line += code.count("\n", start, end)
+        start = end
+    return pieces
+
+
+def lex_chunk(piece):
+    return lexer(*piece)
+
+
+def lexer_parallel(code, workers=None, min_chunk=1 << 18):
+    # Stesso risultato di lexer(code); sotto min_chunk caratteri per processo il pool non conviene
+    workers = workers or os.cpu_count() or 1
+    chunks = min(workers * 4, len(code) // min_chunk)   # più frammenti che processi: carico bilanciato
+    if workers == 1 or chunks < 2:
+        return lexer(code)
+
+    tokens = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk_tokens in pool.map(lex_chunk, split_source(code, chunks)):
+            tokens.extend(chunk_tokens)
+    return tokens
+
+
 if __name__ == "__main__":
     # Esempio di codice C++ da analizzare
     codice = '''
@@ -0,0 +1,273 @@
+import hashlib
+import os
+import pickle
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import lexer as lexer_module
+import parser as parser_module
+import semantic_analyzer as analyzer_module
+from lexer import lexer
+from parser import Parser
+from semantic_analyzer import SemanticAnalyzer
+
+
+'''Cosa fa:
+Programmi su più file con direttive `#include "file"` (percorsi relativi al file che le contiene).
+Ogni modulo viene analizzato separatamente:
+  - lexer e parser dipendono solo dal testo del modulo: l'AST è memorizzato con chiave l'hash del contenuto;
+  - l'analisi semantica parte dai simboli globali dei moduli inclusi (anche indirettamente): i simboli
+    esportati sono memorizzati con chiave l'hash del contenuto più le chiavi delle dipendenze.
+Così modificare un modulo rielabora solo quel modulo e quelli che lo includono.
+I moduli indipendenti vengono elaborati in parallelo su un pool di processi; alla fine gli AST vengono
+collegati in un unico programma (dipendenze prima) con una sola tabella dei simboli globale.
+Ogni file viene incluso una sola volta, come con `#pragma once`.
+'''
+
+INCLUDE_DIRECTIVE = re.compile(r'^[ \t]*#include[ \t]+"([^"\n]+)"[ \t]*$', re.MULTILINE)
+COMPILE_ERRORS = (SyntaxError, ValueError, TypeError, RuntimeError)    # errori di lexer, parser e analisi
+
+
+def toolchain_hash():
+    # Gli artefatti in cache non sono più validi se cambiano lexer, parser o analizzatore
+    digest = hashlib.sha256()
+    for module in (lexer_module, parser_module, analyzer_module):
+        with open(module.__file__, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def split_includes(source):
+    # Restituisce il sorgente con le direttive sostituite da righe vuote (i numeri di riga restano validi)
+    # e la lista dei file inclusi
+    includes = INCLUDE_DIRECTIVE.findall(source)
+    return INCLUDE_DIRECTIVE.sub("", source), includes
+
+
+def parse_module(path, source):
+    try:
+        return Parser(lexer(source)).parse()
+    except COMPILE_ERRORS as e:
+        raise in_module(path, e) from e
+
+
+def analyze_module(path, ast, imported):
+    # Analizza il modulo a partire dai simboli dei moduli inclusi e restituisce i simboli che definisce
+    analyzer = SemanticAnalyzer(ast)
+    analyzer.stack_symbol_table = [dict(imported)]
+    try:
+        analyzer.analyze()
+    except COMPILE_ERRORS as e:
+        raise in_module(path, e) from e
+    return {name: entry for name, entry in analyzer.stack_symbol_table[0].items() if name not in imported}
+
+
+def in_module(path, error):
+    # Stesso tipo di errore, con il file di provenienza: il numero di riga da solo non basta
+    return type(error)(f"{path}: {error}")
+
+
+class Module:
+    def __init__(self, path, source, includes):
+        self.path = path
+        self.source = source        # testo senza direttive #include
+        self.includes = includes    # percorsi assoluti dei moduli inclusi direttamente
+        self.parse_key = None
+        self.analysis_key = None
+        self.ast = None
+        self.symbols = None
+
+
+class ModuleLoader:
+    def __init__(self, cache_dir=".tnf_cache", workers=None):
+        self.cache_dir = cache_dir  # None: solo cache in memoria
+        self.workers = workers      # processi del pool (None: numero di CPU)
+        self.memory = {}            # chiave -> artefatto, per i caricamenti ripetuti nello stesso processo
+        self.salt = toolchain_hash()
+        self.stats = {"parsed": 0, "analyzed": 0, "cached": 0}
+
+    def load(self, path):
+        # Restituisce (AST collegato, tabella dei simboli globale) del programma che ha radice in path
+        order = self.discover(os.path.abspath(path))
+
+        for module in order:
+            module.parse_key = self.digest("parse", module.source)
+            module.analysis_key = self.digest("analysis", module.source,
+                                              *(m.analysis_key for m in self.closure(module, order)))
+
+        self.front_end(order)
+        return self.link(order)
+
+    #  Grafo delle inclusioni
+
+    def discover(self, root):
+        modules = {}
+        order = []      # ordine topologico: ogni modulo dopo quelli che include
+
+        def visit(path, stack):
+            if path in stack:
+                chain = " -> ".join(os.path.basename(p) for p in stack[stack.index(path):] + [path])
+                raise RuntimeError(f"Circular include: {chain}")
+            if path in modules:
+                return
+            try:
+                with open(path, encoding="utf-8") as f:
+                    source, includes = split_includes(f.read())
+            except OSError as e:
+                raise RuntimeError(f"Cannot read module '{path}': {e.strerror}") from e
+            base = os.path.dirname(path)
+            module = Module(path, source, [os.path.abspath(os.path.join(base, inc)) for inc in includes])
+            modules[path] = module
+            for dep in module.includes:
+                visit(dep, stack + [path])
+            order.append(module)
+
+        visit(root, [])
+        return order
+
+    def closure(self, module, order):
+        # Moduli inclusi direttamente o indirettamente, in ordine topologico
+        by_path = {m.path: m for m in order}
+        seen = set()
+        pending = list(module.includes)
+        while pending:
+            path = pending.pop()
+            if path not in seen:
+                seen.add(path)
+                pending.extend(by_path[path].includes)
+        return [m for m in order if m.path in seen]
+
+    #  Front end parallelo con cache
+
+    def front_end(self, order):
+        to_parse = [m for m in order if not self.restore(m, "ast", m.parse_key)]
+        with self.pool(len(to_parse)) as pool:
+            parsed = self.map(pool, parse_module, [m.path for m in to_parse], [m.source for m in to_parse])
+            for module, ast in zip(to_parse, parsed):
+                module.ast = ast
+                self.store(module.parse_key, ast)
+                self.stats["parsed"] += 1
+
+        # Analisi a livelli: un modulo è pronto quando tutte le sue dipendenze hanno i simboli
+        pending = [m for m in order if not self.restore(m, "symbols", m.analysis_key)]
+        done = {m.path for m in order} - {m.path for m in pending}
+        with self.pool(len(pending)) as pool:
+            while pending:
+                ready = [m for m in pending if all(dep in done for dep in m.includes)]
+                imported = [self.imported_symbols(m, order) for m in ready]
+                for module, symbols in zip(ready, self.map(pool, analyze_module, [m.path for m in ready],
+                                                           [m.ast for m in ready], imported)):
+                    module.symbols = symbols
+                    self.store(module.analysis_key, symbols)
+                    self.stats["analyzed"] += 1
+                done |= {m.path for m in ready}
+                pending = [m for m in pending if m.path not in done]
+
+    def imported_symbols(self, module, order):
+        symbols = {}
+        for dep in self.closure(module, order):
+            self.merge(symbols, dep, module.path)
+        return symbols
+
+    def merge(self, symbols, module, origin):
+        for name, entry in module.symbols.items():
+            if name in symbols:
+                raise ValueError(f"Symbol '{name}' from module '{module.path}' already declared "
+                                 f"(while linking '{origin}')")
+            symbols[name] = entry
+
+    def pool(self, jobs):
+        # Con un solo lavoro il pool costerebbe più dell'elaborazione stessa
+        if jobs > 1 and self.workers != 1:
+            return ProcessPoolExecutor(max_workers=self.workers)
+        return InlineExecutor()
+
+    def map(self, pool, fn, *iterables):
+        return list(pool.map(fn, *iterables))
+
+    #  Collegamento
+
+    def link(self, order):
+        ast = []
+        symbols = {}
+        for module in order:
+            self.merge(symbols, module, order[-1].path)
+            ast.extend(module.ast)
+        return ast, symbols
+
+    #  Cache (memoria + disco)
+
+    def digest(self, kind, *parts):
+        h = hashlib.sha256(self.salt.encode())
+        h.update(kind.encode())
+        for part in parts:
+            h.update(b"\0" + part.encode())
+        return h.hexdigest()
+
+    def restore(self, module, attr, key):
+        artifact = self.memory.get(key)
+        if artifact is None and self.cache_dir is not None:
+            try:
+                with open(os.path.join(self.cache_dir, key), "rb") as f:
+                    artifact = pickle.load(f)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                return False
+            self.memory[key] = artifact
+        if artifact is None:
+            return False
+        setattr(module, attr, artifact)
+        self.stats["cached"] += 1
+        return True
+
+    def store(self, key, artifact):
+        self.memory[key] = artifact
+        if self.cache_dir is None:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp = os.path.join(self.cache_dir, f"{key}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump(artifact, f)
+        os.replace(tmp, os.path.join(self.cache_dir, key))  # scrittura atomica
+
+
+class InlineExecutor:
+    # Stessa interfaccia di ProcessPoolExecutor, ma esegue nel processo corrente
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def map(self, fn, *iterables):
+        return map(fn, *iterables)
+
+
+if __name__ == "__main__":
+    import sys
+    import tempfile
+
+    from interpreter import Interpreter
+
+    if len(sys.argv) > 1:
+        main_path = sys.argv[1]
+    else:
+        directory = tempfile.mkdtemp()
+        files = {
+            "matematica.cpp": 'int somma(int a, int b) {\n    return a + b;\n}\n',
+            "stampa.cpp": '#include "matematica.cpp"\nvoid stampa(int x) {\n    cout << somma(x, 0) << endl;\n}\n',
+            "main.cpp": '#include "matematica.cpp"\n#include "stampa.cpp"\n'
+                        'int main() {\n    stampa(somma(2, 3));\n    return 0;\n}\n',
+        }
+        for name, text in files.items():
+            with open(os.path.join(directory, name), "w") as f:
+                f.write(text)
+        main_path = os.path.join(directory, "main.cpp")
+
+    loader = ModuleLoader()
+    ast, symbols = loader.load(main_path)
+    print(loader.stats)
+
+    interpreter = Interpreter(ast)
+    for stmt in ast:
+        interpreter.execute(stmt)
+    interpreter.eval_expr(("funcall", "main", []))
@@ -0,0 +1,388 @@
+from ast_utils import (STEP_NODES, assigned_names, block_contains_call, children, contains_call,
+                       expr_vars, format_expr, is_safe, map_expr, map_statement, statement_bodies,
+                       statement_exprs, walk_expr)
+from semantic_analyzer import SemanticAnalyzer
+
+
+'''Cosa fa:
+Passo di ottimizzazione sull'AST già analizzato. Eredita dal SemanticAnalyzer per tenere aggiornata la pila
+degli scope (e poter calcolare il tipo delle variabili temporanee) mentre ricostruisce il programma:
+  - inlining: le chiamate a funzioni piccole e non ricorsive, il cui corpo è un solo `return espressione;`
+    che usa soltanto i parametri, vengono sostituite dall'espressione stessa;
+  - loop-invariant code motion: le sotto-espressioni pure di un while che non dipendono da variabili
+    modificate nel ciclo vengono calcolate una volta sola prima del ciclo, in una variabile temporanea
+    (non quelle che leggono variabili dichiarate senza valore: valutate in anticipo, anche dove il
+    programma non le raggiungerebbe, troverebbero None);
+  - strength reduction: `x * 1` e (per gli int) `x + 0` diventano `x`, e `x % 2^k` su int diventa
+    `x & (2^k - 1)` (BITAND), che coincide con il modulo dell'interprete anche per i negativi.
+    `x * 2` resta com'è: nell'interprete `x + x` costa di più (due letture e il controllo sulle stringhe);
+  - eliminazione delle sotto-espressioni comuni (value numbering locale): in una sequenza di statement
+    senza salti, chiamate né ++/--, una sotto-espressione sicura calcolata più volte con gli stessi
+    valori delle variabili viene calcolata una volta sola in una temporanea.
+Ogni trasformazione viene registrata in self.report.
+I nomi delle temporanee iniziano con '$', carattere che il lexer non accetta: non possono collidere
+con le variabili del programma.
+'''
+
+
+class Optimizer(SemanticAnalyzer):
+    def __init__(self, ast, max_inline_size=12):
+        super().__init__(ast)
+        self.max_inline_size = max_inline_size  # numero massimo di nodi dell'espressione da inserire
+        self.report = []                        # descrizione di ogni trasformazione applicata
+        self.inlinable = {}                     # nome funzione -> (parametri, espressione di ritorno)
+        self.temp_count = 0
+        self.current_function = None
+        self.uninitialized = set()              # variabili dichiarate senza valore iniziale
+
+    def optimize(self):
+        self.inlinable = self.find_inlinable()
+        self.uninitialized = uninitialized_names(self.ast)
+        self.stack_symbol_table = [{}]
+        return self.block(self.ast)
+
+    #  Ricerca delle funzioni da espandere
+
+    def find_inlinable(self):
+        definitions = {}
+        duplicated = set()
+
+        def collect(stmts):
+            for stmt in stmts:
+                if stmt[0] == "function_def":
+                    if stmt[2] in definitions:
+                        duplicated.add(stmt[2])
+                    definitions[stmt[2]] = stmt
+                    collect(stmt[4])
+                for body in statement_bodies(stmt):
+                    collect(body)
+
+        collect(self.ast)
+
+        candidates = {}
+        for name, (_, _, _, params, body) in definitions.items():
+            if name in duplicated or name == "main" or len(body) != 1 or body[0][0] != "return":
+                continue
+            expr = body[0][1]
+            if expr is None or any(node[0] in STEP_NODES for node in walk_expr(expr)):
+                continue
+            if sum(1 for _ in walk_expr(expr)) > self.max_inline_size:
+                continue
+            if not expr_vars(expr) <= {pname for _, pname in params}:
+                continue    # usa variabili globali: al punto di chiamata potrebbero essere oscurate
+            candidates[name] = (params, expr)
+
+        def resolvable(name, visiting):
+            # Una funzione è espandibile se tutte le funzioni che chiama lo sono, senza cicli
+            if name in visiting or name not in candidates:
+                return False
+            return all(resolvable(node[1], visiting | {name})
+                       for node in walk_expr(candidates[name][1]) if node[0] == "funcall")
+
+        return {name: c for name, c in candidates.items() if resolvable(name, frozenset())}
+
+    #  Ricostruzione del programma
+
+    def block(self, stmts):
+        result = []
+        for stmt in stmts:
+            result.extend(self.statement(stmt))
+        return self.common_subexprs(result)
+
+    def statement(self, stmt):
+        match stmt:
+            case ("function_def", return_type, name, params, body):
+                self.declare_variable(name, ('function', return_type, params))
+                self.stack_symbol_table.append({})
+                for ptype, pname in params:
+                    self.declare_variable(pname, ptype)
+                prev_function, self.current_function = self.current_function, name
+                body = self.block(body)
+                self.current_function = prev_function
+                self.stack_symbol_table.pop()
+                return [("function_def", return_type, name, params, body)]
+
+            case ("declare", type_, name, expr):
+                stmt = ("declare", type_, name, self.rewrite(expr) if expr is not None else None)
+                self.declare_variable(name, type_)
+                return [stmt]
+
+            case ("declare_array", type_, name, size):
+                self.declare_variable(name, ("array", type_, size))
+                return [stmt]
+
+            case ("if", cond, body, else_body):
+                cond = self.rewrite(cond)
+                body = self.scoped_block(body)
+                else_body = self.scoped_block(else_body)
+                return [("if", cond, body, else_body)]
+
+            case ("while", cond, body):
+                cond = self.rewrite(cond)
+                body = self.scoped_block(body)
+                return self.hoist_invariants(cond, body)
+
+        return [map_statement(stmt, self.rewrite)]
+
+    def scoped_block(self, stmts):
+        self.stack_symbol_table.append({})
+        stmts = self.block(stmts)
+        self.stack_symbol_table.pop()
+        return stmts
+
+    #  Riscrittura delle espressioni: inlining e strength reduction, dal basso verso l'alto
+
+    def rewrite(self, expr):
+        return map_expr(expr, self.rewrite_node)
+
+    def rewrite_node(self, node):
+        return self.reduce_strength(self.inline_call(node))
+
+    #  Inlining
+
+    def inline_call(self, node):
+        if node[0] != "funcall" or node[1] not in self.inlinable:
+            return node
+        name, args = node[1], node[2]
+        if not all(is_safe(arg) for arg in args):
+            return node     # gli argomenti verrebbero valutati un numero diverso di volte
+        params, body = self.inlinable[name]
+        binding = {pname: arg for (_, pname), arg in zip(params, args)}
+        expanded = map_expr(body, lambda n: binding[n[1]] if n[0] == "var" else n)
+        self.log(f"inlined {format_expr(node)} as {format_expr(expanded)}")
+        # Il corpo può chiamare altre funzioni espandibili: si prosegue sul risultato
+        return self.rewrite(expanded)
+
+    #  Strength reduction
+
+    def reduce_strength(self, node):
+        match node:
+            case ("binop", "TIMES", x, ("int", one)) | ("binop", "TIMES", ("int", one), x) if int(one) == 1:
+                reduced = x
+            case ("binop", "PLUS", x, ("int", zero)) | ("binop", "PLUS", ("int", zero), x) \
+                    if int(zero) == 0 and self.expr_type(x) == "TYPE_INT":
+                reduced = x     # per i float x + 0 cambierebbe -0.0 in 0.0
+            case ("binop", "MODULE", x, ("int", value)) if is_power_of_two(int(value)) \
+                    and self.expr_type(x) == "TYPE_INT":
+                reduced = ("binop", "BITAND", x, ("int", str(int(value) - 1)))
+            case _:
+                return node
+        self.log(f"reduced {format_expr(node)} to {format_expr(reduced)}")
+        return reduced
+
+    #  Loop-invariant code motion
+
+    def hoist_invariants(self, cond, body):
+        if contains_call(cond) or block_contains_call(body):
+            return [("while", cond, body)]  # una chiamata potrebbe modificare qualsiasi variabile globale
+
+        variant = assigned_names(body) | {node[1] for node in walk_expr(cond) if node[0] in STEP_NODES}
+        found = []
+        self.collect_invariants(cond, variant, found)
+        for stmt in iter_block(body):
+            for expr in statement_exprs(stmt):
+                self.collect_invariants(expr, variant, found)
+
+        if not found:
+            return [("while", cond, body)]
+
+        hoisted = []
+        replacements = {}
+        for expr in found:
+            if expr in replacements:
+                continue
+            temp = f"$licm{self.temp_count}"
+            self.temp_count += 1
+            type_ = self.expr_type(expr)
+            self.declare_variable(temp, type_)
+            hoisted.append(("declare", type_, temp, expr))
+            replacements[expr] = ("var", temp)
+            self.log(f"hoisted {format_expr(expr)} out of while {format_expr(cond)} as {temp}")
+
+        replace = lambda expr: replace_subexprs(expr, replacements)
+        loop = map_statement(("while", cond, body), replace)
+        return hoisted + [loop]
+
+    def collect_invariants(self, expr, variant, found):
+        # Raccoglie le sotto-espressioni invarianti massimali che contengono almeno un'operazione
+        if expr[0] in ("binop", "concat", "minus", "not") and self.is_invariant(expr, variant):
+            if any(node[0] in ("binop", "concat") for node in walk_expr(expr)):
+                found.append(expr)
+            return
+        for child in children(expr):
+            self.collect_invariants(child, variant, found)
+
+    def is_invariant(self, expr, variant):
+        if not is_safe(expr):
+            return False
+        names = expr_vars(expr)
+        if names & (variant | self.uninitialized):
+            return False
+        for name in names:
+            try:
+                entry = self.lookup_variable(name)
+            except ValueError:
+                return False
+            if isinstance(entry, tuple):
+                return False
+        return True
+
+    #  Eliminazione delle sotto-espressioni comuni
+
+    def common_subexprs(self, stmts):
+        # Sostituisce un'espressione ripetuta alla volta, la più grande, finché ce ne sono: le sotto-espressioni
+        # di una temporanea appena introdotta possono a loro volta essere in comune con altri statement
+        while True:
+            windows = [w for w in common_windows(stmts) if w[3] >= 2 and not self.shadowed(w[0], stmts, w[1])]
+            if not windows:
+                return stmts
+            expr, first, last, uses = max(windows, key=lambda w: (expr_size(w[0]), -w[1]))
+            temp = f"$cse{self.temp_count}"
+            self.temp_count += 1
+            type_ = self.expr_type(expr)
+            self.declare_variable(temp, type_)
+            self.log(f"reused {format_expr(expr)} as {temp} ({uses} uses)")
+
+            replacements = {expr: ("var", temp)}
+            replace = lambda e: replace_subexprs(e, replacements)
+            window = [replace_in_statement(stmt, replace) for stmt in stmts[first:last + 1]]
+            stmts = stmts[:first] + [("declare", type_, temp, expr)] + window + stmts[last + 1:]
+
+    def shadowed(self, expr, stmts, first):
+        # Il tipo della temporanea si calcola alla fine del blocco: le variabili dell'espressione non devono
+        # essere state ridichiarate più avanti nel blocco
+        names = expr_vars(expr)
+        return any(stmt[0] in ("declare", "declare_array") and stmt[2] in names for stmt in stmts[first + 1:])
+
+    def log(self, message):
+        self.report.append(f"{self.current_function or '<global>'}: {message}")
+
+
+def iter_block(stmts):
+    # Tutti gli statement del blocco, compresi quelli dei blocchi if/while annidati
+    for stmt in stmts:
+        yield stmt
+        for body in statement_bodies(stmt):
+            yield from iter_block(body)
+
+
+def uninitialized_names(stmts):
+    # Nomi delle variabili dichiarate senza valore iniziale, in tutto il programma (funzioni comprese)
+    names = set()
+    for stmt in stmts:
+        match stmt:
+            case ("declare", _, name, None):
+                names.add(name)
+            case ("function_def", _, _, _, body):
+                names |= uninitialized_names(body)
+        for body in statement_bodies(stmt):
+            names |= uninitialized_names(body)
+    return names
+
+
+def evaluated_nodes(expr):
+    # Come walk_expr, ma senza entrare nel secondo operando di && e ||, che può non essere valutato
+    yield expr
+    if expr[0] == "binop" and expr[1] in ("AND", "OR"):
+        yield from evaluated_nodes(expr[2])
+        return
+    for child in children(expr):
+        yield from evaluated_nodes(child)
+
+
+def is_power_of_two(value):
+    return value > 0 and value & (value - 1) == 0
+
+
+def expr_size(expr):
+    return sum(1 for _ in walk_expr(expr))
+
+
+def is_barrier(stmt):
+    # Statement che interrompono una sequenza di calcolo per il value numbering
+    return stmt[0] in ("while", "function_def") or block_contains_call([stmt]) \
+        or any(node[0] in STEP_NODES for expr in statement_exprs(stmt) for node in walk_expr(expr))
+
+
+def common_windows(stmts):
+    # Per ogni sotto-espressione candidata (binop sicura), gli intervalli di statement in cui mantiene
+    # lo stesso valore: (espressione, primo statement, ultimo statement, occorrenze).
+    # Un if chiude tutti gli intervalli dopo la sua condizione (i corpi sono blocchi a parte).
+    # Il secondo operando di && e || non viene considerato: la temporanea lo calcolerebbe sempre
+    active = {}
+    for i, stmt in enumerate(stmts):
+        if is_barrier(stmt):
+            yield from ((expr, *window) for expr, window in active.items())
+            active.clear()
+            continue
+        for expr in statement_exprs(stmt):
+            for node in evaluated_nodes(expr):
+                if node[0] == "binop" and is_safe(node):
+                    window = active.setdefault(node, [i, i, 0])
+                    window[1] = i
+                    window[2] += 1
+        if stmt[0] == "if":
+            yield from ((expr, *window) for expr, window in active.items())
+            active.clear()
+            continue
+        killed = assigned_names([stmt])
+        for expr in [expr for expr in active if expr_vars(expr) & killed]:
+            yield (expr, *active.pop(expr))
+    yield from ((expr, *window) for expr, window in active.items())
+
+
+def replace_in_statement(stmt, fn):
+    # Come map_statement, ma di un if sostituisce solo la condizione
+    if stmt[0] == "if":
+        return ("if", fn(stmt[1]), stmt[2], stmt[3])
+    return map_statement(stmt, fn)
+
+
+def replace_subexprs(expr, replacements):
+    # Sostituzione dall'alto verso il basso; le espressioni non contengono chiamate (liste non hashabili)
+    if expr in replacements:
+        return replacements[expr]
+    match expr:
+        case ("binop", op, left, right):
+            return ("binop", op, replace_subexprs(left, replacements), replace_subexprs(right, replacements))
+        case ("concat", left, right):
+            return ("concat", replace_subexprs(left, replacements), replace_subexprs(right, replacements))
+        case ("not", inner) | ("minus", inner):
+            return (expr[0], replace_subexprs(inner, replacements))
+        case ("index", name, index):
+            return ("index", name, replace_subexprs(index, replacements))
+    return expr
+
+
+if __name__ == "__main__":
+    from lexer import lexer
+    from parser import Parser
+
+    codice = '''
+    int somma(int a, int b) {
+        return a + b;
+    }
+
+    int main() {
+        int n = 10;
+        int k = 3;
+        int i = 0;
+        int totale = 0;
+        while (i < n) {
+            totale = somma(totale, k * n + 1);
+            i = i + 1;
+        }
+        cout << totale << endl;
+        return 0;
+    }
+    '''
+
+    ast = Parser(lexer(codice)).parse()
+    SemanticAnalyzer(ast).analyze()
+    optimizer = Optimizer(ast)
+    optimized = optimizer.optimize()
+    for line in optimizer.report:
+        print(line)
+    from pprint import pprint
+
+    pprint(optimized)
@@ -1,8 +1,9 @@
 from lexer import lexer
 class Parser:
-    def __init__(self, tokens):
+    def __init__(self, tokens, lazy=False):
         self.tokens = tokens  # Lista di token prodotti dal lexer
         self.pos = 0  # Posizione corrente nella lista dei token
+        self.lazy = lazy  # Se True i corpi delle funzioni vengono parsati solo al primo utilizzo
 
     def peek(self):
         # Guarda il prossimo token senza consumarlo (non avanza la posizione)
@@ -77,6 +78,17 @@ class Parser:
         expr = None  # Espressione di inizializzazione (opzionale)
         tok = self.peek()
 
+        if tok and tok[0] == "LBRACKET":  # Array di dimensione fissa, es: int a[10];
+            if type_ not in ("TYPE_INT", "TYPE_FLOAT"):
+                self.error(f"Arrays are supported only for int and float, not {type_}", tok)
+            self.advance()  # Consuma "["
+            size_tok = self.expect("INT")
+            if int(size_tok[1]) == 0:
+                self.error(f"Array '{name}' must have a positive size", size_tok)
+            self.expect("RBRACKET")
+            self.expect("SEMICOLON")
+            return ("declare_array", type_, name, int(size_tok[1]))
+
         if tok and tok[0] == "ASSIGN":
             self.advance()  # Consuma il segno "="
             expr = self.logic()  # Parso l'espressione a destra
@@ -88,6 +100,13 @@ class Parser:
         # Gestisce assegnazione (es: x = 5;) o chiamata funzione (es: foo(3);)
         name = self.advance()[1]  # Prende il nome (ID)
         tok = self.peek()
+        if tok and tok[0] == "LBRACKET":  # Assegnazione a un elemento di array, es: a[i] = 5;
+            index = self.subscript()
+            self.expect("ASSIGN")
+            expr = self.logic()
+            self.expect("SEMICOLON")
+            return ("assign_index", name, index, expr)
+
         if tok and tok[0] == "ASSIGN":
             self.advance()  # Consuma "="
             expr = self.logic()  # Valuta la parte destra dell'assegnazione
@@ -206,6 +225,8 @@ class Parser:
         while True:
             self.expect("RSHIFT")
             var = self.expect("ID")[1]
+            if self.peek() and self.peek()[0] == "LBRACKET":  # cin >> a[i]
+                var = ("index", var, self.subscript())
             vars_.append(var)
 
             # fine istruzione
@@ -291,6 +312,9 @@ class Parser:
             elif self.peek() and self.peek()[0] == "DECREMENT":
                 self.advance()
                 return ("post_decrement", name)
+            # Elemento di array
+            if self.peek() and self.peek()[0] == "LBRACKET":
+                return ("index", name, self.subscript())
             # Funzione o variabile
             if self.peek() and self.peek()[0] == "LPAREN":
                 self.advance()  # Consuma '('
@@ -318,6 +342,13 @@ class Parser:
             self.error(f"Unexpected token {tok}", tok)
 
 
+    def subscript(self):
+        # [ espressione ] dopo il nome di un array
+        self.expect("LBRACKET")
+        index = self.logic()
+        self.expect("RBRACKET")
+        return index
+
     def function_definition(self):
         return_type = self.advance()[0]  # tipo di ritorno (INT, FLOAT, STRING)
         name = self.expect("ID")[1]  # nome della funzione
@@ -333,17 +364,81 @@ class Parser:
                 self.advance()  # ,
         self.expect("RPAREN")  # )
         self.expect("LBRACE")  # {
+        if self.lazy:
+            return ("function_def", return_type, name, params, self.skip_body())
+        return ("function_def", return_type, name, params, self.function_body())
+
+    def function_body(self):
+        # Statement del corpo fino alla '}' di chiusura (inclusa)
         body = []
         while self.peek() and self.peek()[0] != "RBRACE":
             body.append(self.statement())
         self.expect("RBRACE")  # }
-        return ("function_def", return_type, name, params, body)
+        return body
+
+    def skip_body(self):
+        # Salta il corpo contando le graffe e ne ricorda soltanto l'intervallo di token
+        start = self.pos
+        depth = 1
+        while depth:
+            tok = self.peek()
+            if tok is None:
+                self.expect("RBRACE")   # stesso errore del parsing completo
+            self.advance()
+            if tok[0] == "LBRACE":
+                depth += 1
+            elif tok[0] == "RBRACE":
+                depth -= 1
+        return LazyBody(self.tokens, start, self.pos - 1)
 
     def error(self, msg, tok):
+        if tok is None and self.tokens:
+            tok = self.tokens[-1]   # fine dell'input: si indica la riga dell'ultimo token
         line = tok[2] if tok else '?'
         raise SyntaxError(f"Error in line {line}: {msg}")  # Stampa un errore di sintassi
 
 
+class LazyBody:
+    '''Corpo di funzione non ancora parsato: si comporta come la lista di statement, che viene
+    costruita al primo accesso (iterazione, len, indice). on_parse, se impostato, viene chiamato
+    una sola volta con gli statement appena parsati (il SemanticAnalyzer lo usa per l'analisi differita).'''
+
+    def __init__(self, tokens, start, end):
+        self.tokens = tokens
+        self.start = start  # primo token dopo '{'
+        self.end = end      # posizione della '}' di chiusura
+        self.statements = None
+        self.on_parse = None
+
+    @property
+    def parsed(self):
+        return self.statements is not None
+
+    def force(self):
+        if self.statements is None:
+            # La '}' di chiusura fa parte dei token: gli errori a fine corpo hanno la stessa riga del parsing completo
+            statements = Parser(self.tokens[self.start:self.end + 1], lazy=True).function_body()
+            if self.on_parse is not None:
+                self.on_parse(statements)
+                self.on_parse = None
+            self.statements = statements
+        return self.statements
+
+    def __iter__(self):
+        return iter(self.force())
+
+    def __len__(self):
+        return len(self.force())
+
+    def __getitem__(self, index):
+        return self.force()[index]
+
+    def __repr__(self):
+        if self.statements is None:
+            return f"<unparsed body: tokens {self.start}-{self.end}>"
+        return repr(self.statements)
+
+
 # === ESEMPIO USO ===
 if __name__ == "__main__":
     # Esempio di codice C++ da analizzare
@@ -0,0 +1,81 @@
+'''Cosa fa:
+Rappresentazione a tempo di esecuzione dei valori TYPE_STRING prodotti da concatenazioni.
+Una Rope è una lista di pezzi più il numero di pezzi che le appartengono: la lista è condivisa
+tra la stringa originale e quella ottenuta aggiungendo un pezzo in coda, quindi `s = s + x;`
+costa O(1) ammortizzato invece di ricopiare tutta la stringa.
+Se una stringa più vecchia viene estesa di nuovo (la lista condivisa è già stata allungata da
+un'altra), i suoi pezzi vengono prima copiati: ogni Rope resta immutabile come una str.
+Il testo viene ricostruito (e memorizzato) solo quando serve: confronti, stampa, str().
+'''
+
+
+class Rope:
+    __slots__ = ("parts", "count", "flat")
+
+    def __init__(self, parts):
+        self.parts = parts          # lista di str, eventualmente condivisa con altre Rope
+        self.count = len(parts)     # pezzi di questa stringa: parts[:count]
+        self.flat = None            # testo già ricostruito, se richiesto almeno una volta
+
+    def append(self, text):
+        parts = self.parts
+        if len(parts) != self.count:
+            parts = parts[:self.count]
+        parts.append(text)
+        return Rope(parts)
+
+    def __str__(self):
+        if self.flat is None:
+            parts = self.parts
+            self.flat = "".join(parts if len(parts) == self.count else parts[:self.count])
+        return self.flat
+
+    def __repr__(self):
+        return repr(str(self))
+
+    def __hash__(self):
+        return hash(str(self))
+
+    # I confronti appiattiscono la stringa e si comportano come quelli di str
+
+    def __eq__(self, other):
+        if isinstance(other, (str, Rope)):
+            return str(self) == str(other)
+        return NotImplemented
+
+    def __ne__(self, other):
+        if isinstance(other, (str, Rope)):
+            return str(self) != str(other)
+        return NotImplemented
+
+    def __lt__(self, other):
+        if isinstance(other, (str, Rope)):
+            return str(self) < str(other)
+        return NotImplemented
+
+    def __le__(self, other):
+        if isinstance(other, (str, Rope)):
+            return str(self) <= str(other)
+        return NotImplemented
+
+    def __gt__(self, other):
+        if isinstance(other, (str, Rope)):
+            return str(self) > str(other)
+        return NotImplemented
+
+    def __ge__(self, other):
+        if isinstance(other, (str, Rope)):
+            return str(self) >= str(other)
+        return NotImplemented
+
+
+def concat(left, right):
+    # Somma di stringhe (almeno un operando è str o Rope): estende la Rope di sinistra se possibile
+    if isinstance(left, Rope):
+        return left.append(str(right))
+    return Rope([str(left), str(right)])
+
+
+def plain(value):
+    # Valore che esce dall'interprete (es. il risultato di main): una Rope diventa una str
+    return str(value) if isinstance(value, Rope) else value
@@ -0,0 +1,65 @@
+import io
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from interpreter import Interpreter
+from lexer import lexer
+from parser import Parser
+from rope import plain
+from semantic_analyzer import SemanticAnalyzer
+
+
+'''Cosa fa:
+Punto d'ingresso per eseguire programmi completi: lexer -> parser -> analisi semantica -> interprete.
+Ogni esecuzione usa un'istanza di Interpreter con i propri stream di input/output e nessuno stato
+globale modificabile, quindi più programmi possono girare contemporaneamente sui thread di un pool
+(in parallelo sui core con il CPython free-threaded).
+'''
+
+
+def compile_source(source, lazy=False):
+    # lazy: i corpi delle funzioni vengono parsati e analizzati solo quando servono
+    ast = Parser(lexer(source), lazy).parse()
+    SemanticAnalyzer(ast).analyze()
+    return ast
+
+
+def run_program(ast, stdin=None, stdout=None):
+    # Registra funzioni e variabili globali, poi esegue main e ne restituisce il valore
+    interpreter = Interpreter(ast, stdin, stdout)
+    for stmt in ast:
+        interpreter.execute(stmt)
+    return plain(interpreter.eval_expr(("funcall", "main", [])))
+
+
+def run_source(source, stdin_text=""):
+    # Compila ed esegue un programma, restituendo il testo stampato
+    output = io.StringIO()
+    run_program(compile_source(source), io.StringIO(stdin_text), output)
+    return output.getvalue()
+
+
+def run_many(jobs, max_workers=None):
+    # jobs: coppie (sorgente, testo di input). Restituisce gli output nello stesso ordine;
+    # un programma che fallisce restituisce l'eccezione sollevata al posto del suo output
+    def run_job(job):
+        try:
+            return run_source(*job)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(run_job, jobs))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python runner.py <program.cpp>")
+    with open(sys.argv[1], encoding="utf-8") as f:
+        codice = f.read()
+    try:
+        run_program(compile_source(codice), sys.stdin, sys.stdout)
+    except Exception as e:
+        sys.stdout.flush()
+        print(f"{type(e).__name__}: {e}", file=sys.stderr)
+        sys.exit(1)
@@ -1,3 +1,8 @@
+from itertools import islice
+
+from parser import LazyBody
+
+
 class SemanticAnalyzer:
     def __init__(self, ast):
         self.ast = ast
@@ -48,6 +53,15 @@ class SemanticAnalyzer:
 
                 self.declare_variable(name, type_)
 
+            case ("declare_array", type_, name, size):
+                self.declare_variable(name, ("array", type_, size))
+
+            case ("assign_index", name, index, expr):
+                elem_type = self.array_element(name, index)
+                expr_type = self.expr_type(expr)
+                if not self.type_compatible(elem_type, expr_type):
+                    raise TypeError(f"Type incompatibility in assignment to '{name}[]': {elem_type} vs {expr_type}")
+
             case ("assign", name, expr):
                 expr_type = self.expr_type(expr)
                 var_type = self.lookup_variable(name)
@@ -90,9 +104,14 @@ class SemanticAnalyzer:
 
             case ("cin", names):        # names è lista di ID
                 for n in names:
+                    if isinstance(n, tuple):        # elemento di array: cin >> a[i]
+                        self.array_element(n[1], n[2])
+                        continue
                     tipo = self.lookup_variable(n)
                     if tipo == "VOID":                      # cin su VOID
                         raise TypeError(f"Cannot read input into variable '{n}' of type VOID")
+                    if isinstance(tipo, tuple):             # cin su array o funzione
+                        raise TypeError(f"Cannot read input into '{n}': not a scalar variable")
 
             case ("function_def", return_type, name, params, body):
 
@@ -113,25 +132,15 @@ class SemanticAnalyzer:
                         raise ValueError(f"Duplicate parameter name '{pname}' in function '{name}'")
                     param_names.add(pname)
 
-                # nuovo scope per i parametri
-                self.stack_symbol_table.append({})
-                for ptype, pname in params:
-                    self.declare_variable(pname, ptype)
-
-                prev_ret = self.current_function_return_type
-                self.current_function_return_type = return_type
-
-                # visita corpo funzione
-                for stmt in body:
-                    self.visit(stmt)
-
-                self.current_function_return_type = prev_ret
-                self.stack_symbol_table.pop()
-
-                # return mancante per funzioni non-void
-                if return_type != "VOID":
-                    if not any(self.contains_return(stmt) for stmt in body):
-                        raise TypeError(f"Function '{name}' declared as {return_type[5:].lower()} but has no return statement")
+                if isinstance(body, LazyBody) and not body.parsed:
+                    # Corpo non ancora parsato: verrà analizzato al primo utilizzo, con gli scope di adesso.
+                    # Gli scope possono solo crescere: basta ricordarne la lunghezza attuale
+                    scopes = [(scope, len(scope)) for scope in self.stack_symbol_table]
+                    in_main = self.in_main
+                    body.on_parse = lambda stmts: self.deferred_function_body(
+                        scopes, in_main, return_type, name, params, stmts)
+                else:
+                    self.function_body(return_type, name, params, body)
 
             # Chiamata funzione (fuori dalle espressioni)
             case ("funcall", _name, _args):
@@ -158,6 +167,37 @@ class SemanticAnalyzer:
             case _:
                 raise ValueError(f"Unknown node type: {node}")
 
+    def function_body(self, return_type, name, params, body):
+        # nuovo scope per i parametri
+        self.stack_symbol_table.append({})
+        for ptype, pname in params:
+            self.declare_variable(pname, ptype)
+
+        prev_ret = self.current_function_return_type
+        self.current_function_return_type = return_type
+
+        # visita corpo funzione
+        for stmt in body:
+            self.visit(stmt)
+
+        self.current_function_return_type = prev_ret
+        self.stack_symbol_table.pop()
+
+        # return mancante per funzioni non-void
+        if return_type != "VOID":
+            if not any(self.contains_return(stmt) for stmt in body):
+                raise TypeError(f"Function '{name}' declared as {return_type[5:].lower()} but has no return statement")
+
+    def deferred_function_body(self, scopes, in_main, return_type, name, params, body):
+        # Analizza un corpo parsato in modo pigro ripristinando gli scope del momento della definizione
+        saved = self.stack_symbol_table, self.in_main
+        self.stack_symbol_table = [dict(islice(scope.items(), size)) for scope, size in scopes]
+        self.in_main = in_main
+        try:
+            self.function_body(return_type, name, params, body)
+        finally:
+            self.stack_symbol_table, self.in_main = saved
+
     #  Analisi espressioni
 
     def expr_type(self, expr):
@@ -169,7 +209,13 @@ class SemanticAnalyzer:
             case ("bool", _):   return "TYPE_BOOL"
 
             case ("var", name):
-                return self.lookup_variable(name)
+                var_type = self.lookup_variable(name)
+                if isinstance(var_type, tuple) and var_type[0] == "array":     # es. cout << a;
+                    raise TypeError(f"Array '{name}' cannot be used as a value, only its elements '{name}[i]'")
+                return var_type
+
+            case ("index", name, index):
+                return self.array_element(name, index)
 
             case ("minus", inner) | ("not", inner):
                 inner_t = self.expr_type(inner)
@@ -211,6 +257,11 @@ class SemanticAnalyzer:
                         return "TYPE_STRING"
                     raise TypeError(f"Arithmetic operation of incompatible type: {l}, {r}")
 
+                if op == "BITAND":      # introdotto solo dall'ottimizzatore, al posto di % su int
+                    if l == r == "TYPE_INT":
+                        return l
+                    raise TypeError(f"Bitwise AND of incompatible type: {l}, {r}")
+
                 if op in ("EQ", "NEQ", "LT", "GT", "LE", "GE"):
                     numeric_types = ("TYPE_INT", "TYPE_FLOAT")
                     if (l == r) or (l in numeric_types and r in numeric_types):
@@ -248,6 +299,17 @@ class SemanticAnalyzer:
                 raise TypeError(f"Expression not recognized: {expr}")
 
 
+    #  Accesso a un elemento di array: restituisce il tipo degli elementi
+
+    def array_element(self, name, index):
+        entry = self.lookup_variable(name)
+        if not (isinstance(entry, tuple) and entry[0] == "array"):
+            raise TypeError(f"'{name}' is not an array")
+        index_type = self.expr_type(index)
+        if index_type != "TYPE_INT":
+            raise TypeError(f"Array index for '{name}' must be an int, got {index_type}")
+        return entry[1]
+
     #  Compatibilità di tipo (int-to-float permessa)
 
     def type_compatible(self, declared, expr_type):
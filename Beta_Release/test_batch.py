@@ -0,0 +1,50 @@
+from batch import BatchInterpreter
+from runner import compile_source
+
+
+PROGRAM = '''
+int main() {
+    int n;
+    cin >> n;
+    cout << n * 2 << endl;
+    return 0;
+}
+'''
+
+
+def test_failing_lanes_do_not_stop_the_batch():
+    inputs = ["5\n", "abc\n", "", "7\n"]
+    outputs = BatchInterpreter(compile_source(PROGRAM), inputs).run()
+
+    assert outputs[0] == "10\n"
+    assert isinstance(outputs[1], RuntimeError)
+    assert isinstance(outputs[2], EOFError)
+    assert outputs[3] == "14\n"
+
+
+def test_valid_lanes_match_scalar_runs():
+    inputs = [f"{n}\n" for n in range(-3, 4)]
+    batch = BatchInterpreter(compile_source(PROGRAM), inputs)
+    assert batch.run() == [batch.run_scalar(text) for text in inputs]
+
+
+def test_uninitialized_variables_match_scalar_runs():
+    source = '''
+    int main() {
+        int x;
+        cin >> x;
+        int y;
+        if (x > 2) {
+            y = 5;
+        }
+        cout << y << endl;
+        return 0;
+    }
+    '''
+    inputs = ["1\n", "3\n", "7\n"]
+    batch = BatchInterpreter(compile_source(source), inputs)
+    assert batch.run() == [batch.run_scalar(text) for text in inputs] == ["None\n", "5\n", "5\n"]
+
+    inputs = ["3\n", "7\n"]     # tutte le lane assegnano y: resta vettoriale
+    batch = BatchInterpreter(compile_source(source), inputs)
+    assert batch.run() == ["5\n", "5\n"] and batch.vectorized
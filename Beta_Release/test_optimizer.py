@@ -0,0 +1,53 @@
+import io
+
+from optimizer import Optimizer
+from runner import compile_source, run_program
+
+
+def run_both(source):
+    # Output del programma originale e di quello ottimizzato, più il report dell'ottimizzatore
+    ast = compile_source(source)
+    optimizer = Optimizer(ast)
+    optimized = optimizer.optimize()
+    outputs = []
+    for program in (ast, optimized):
+        output = io.StringIO()
+        run_program(program, io.StringIO(""), output)
+        outputs.append(output.getvalue())
+    return outputs, optimizer.report
+
+
+def test_licm_skips_uninitialized_variables():
+    source = '''
+    int main() {
+        int k;
+        int i = 0;
+        while (i < 3) {
+            if (i > 5) {
+                cout << k * 2;
+            }
+            i = i + 1;
+        }
+        cout << i << endl;
+        return 0;
+    }
+    '''
+    (original, optimized), report = run_both(source)
+    assert original == optimized == "3\n"
+    assert not any("hoisted" in line for line in report)
+
+
+def test_cse_keeps_short_circuit():
+    source = '''
+    int main() {
+        int k;
+        bool f = false;
+        bool b = f && k * 2 > 0;
+        bool c = f && k * 2 > 1;
+        cout << b << c << endl;
+        return 0;
+    }
+    '''
+    (original, optimized), report = run_both(source)
+    assert original == optimized
+    assert not any("reused" in line for line in report)
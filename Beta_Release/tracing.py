@@ -0,0 +1,115 @@
+import json
+import os
+import threading
+import time
+
+from interpreter import EVENTS
+
+
+'''Cosa fa:
+Sink degli eventi dell'Interpreter che produce un file JSON nel formato "trace event" di Chrome
+(apribile con chrome://tracing o con Perfetto):
+  - ogni chiamata di funzione è una fascia B/E con gli argomenti e il valore restituito;
+  - ogni attesa su cin è una fascia "cin";
+  - le scritture cout consecutive (senza chiamate né letture in mezzo) formano un'unica fascia
+    "cout burst", con il numero di scritture; la durata è la somma dei soli tempi di scrittura, non
+    il calcolo dell'interprete tra una scrittura e l'altra (l'intervallo complessivo è in args);
+  - la profondità della pila degli scope è un contatore;
+  - gli statement, se richiesti, sono eventi istantanei (sono molti: di default non vengono registrati).
+'''
+
+DEFAULT_EVENTS = tuple(event for event in EVENTS if event != "statement")
+
+
+class ChromeTraceSink:
+    def __init__(self):
+        self.events = []
+        self.start = time.perf_counter()
+        self.pid = os.getpid()
+        # thread -> [inizio, fine dell'ultima scrittura, numero di scritture, tempo totale di scrittura,
+        #            inizio della scrittura in corso]
+        self.bursts = {}
+
+    def attach(self, interpreter, events=DEFAULT_EVENTS):
+        for event in events:
+            interpreter.subscribe(event, self)
+
+    def detach(self, interpreter, events=DEFAULT_EVENTS):
+        for event in events:
+            interpreter.unsubscribe(event, self)
+
+    def __call__(self, event, *data):
+        now = self.timestamp()
+        tid = threading.get_ident()
+        match event, data:
+            case "io_wait", ("cout", "begin"):
+                burst = self.bursts.setdefault(tid, [now, now, 0, 0.0, now])
+                burst[2] += 1
+                burst[4] = now
+            case "io_wait", ("cout", "end"):
+                if tid in self.bursts:
+                    burst = self.bursts[tid]
+                    burst[1] = now
+                    burst[3] += now - burst[4]
+            case "statement", (node,):
+                self.record(tid, "i", node[0], "statement", now, s="t")
+            case ("scope_push" | "scope_pop"), (depth,):
+                # scope_pop riporta la profondità prima della rimozione
+                self.record(tid, "C", "scope depth", "scope", now,
+                            args={"depth": depth if event == "scope_push" else depth - 1})
+            case _:
+                self.close_burst(tid)
+                match event, data:
+                    case "function_enter", (name, arg_values):
+                        self.record(tid, "B", name, "function", now, args={"args": [repr(v) for v in arg_values]})
+                    case "function_exit", (name, value):
+                        self.record(tid, "E", name, "function", now, args={"return": repr(value)})
+                    case "io_wait", ("cin", phase):
+                        self.record(tid, "B" if phase == "begin" else "E", "cin", "io", now)
+
+    def close_burst(self, tid):
+        burst = self.bursts.pop(tid, None)
+        if burst is not None:
+            start, end, writes, io_time, _ = burst
+            self.record(tid, "X", "cout burst", "io", start, dur=io_time,
+                        args={"writes": writes, "span": end - start})
+
+    def record(self, tid, phase, name, category, ts, **fields):
+        self.events.append({"name": name, "cat": category, "ph": phase, "ts": ts,
+                            "pid": self.pid, "tid": tid, **fields})
+
+    def timestamp(self):
+        return (time.perf_counter() - self.start) * 1e6    # microsecondi
+
+    def write(self, path):
+        for tid in list(self.bursts):
+            self.close_burst(tid)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+
+
+if __name__ == "__main__":
+    import sys
+
+    from interpreter import Interpreter
+    from runner import compile_source
+
+    if len(sys.argv) != 3:
+        sys.exit("Usage: python tracing.py <program.cpp> <trace.json>")
+    with open(sys.argv[1], encoding="utf-8") as f:
+        codice = f.read()
+
+    sink = ChromeTraceSink()
+    try:
+        ast = compile_source(codice)
+        interpreter = Interpreter(ast, sys.stdin, sys.stdout)
+        sink.attach(interpreter)
+        for stmt in ast:
+            interpreter.execute(stmt)
+        interpreter.eval_expr(("funcall", "main", []))
+    except Exception as e:
+        sys.stdout.flush()
+        print(f"{type(e).__name__}: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        sink.write(sys.argv[2])